@@ -0,0 +1,66 @@
+"""Time draft workspace generation for a burst of new ideas per worker count.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.generation --papers 500 --workers 1,4,8
+"""
+
+from __future__ import annotations
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from backend.epi_ape.generation import generate_batch
+from backend.epi_ape.models import PaperRecord
+from backend.epi_ape.utils import set_fsync
+
+
+def make_ideas(count: int) -> list[PaperRecord]:
+    return [
+        PaperRecord(
+            id=f"epi_a_{number:04d}",
+            title=f"Benchmark Idea {number}",
+            source="ai",
+            venue="EPI-APE Candidate",
+            track="Community Health",
+            method="Event Study",
+            year=2026,
+            paper_url="#",
+            status="idea",
+        )
+        for number in range(1, count + 1)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--papers", type=int, default=500)
+    parser.add_argument("--workers", default="1,4,8")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    worker_counts = [int(part) for part in args.workers.split(",") if part]
+
+    print(f"{args.papers} workspaces, best of {args.repeat}")
+    print(f"{'fsync':<7}{'workers':>8}{'ms':>10}{'workspaces/s':>14}")
+    for fsync in (False, True):
+        set_fsync(fsync)
+        for workers in worker_counts:
+            best = float("inf")
+            for _ in range(args.repeat):
+                root = Path(tempfile.mkdtemp()) / "papers"
+                ideas = make_ideas(args.papers)
+                start = time.perf_counter()
+                generate_batch(root, ideas, args.papers, workers=workers)
+                best = min(best, time.perf_counter() - start)
+                shutil.rmtree(root.parent)
+            print(
+                f"{'on' if fsync else 'off':<7}{workers:>8}{best * 1e3:>10.1f}"
+                f"{args.papers / best:>14.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compare the legacy and current-schema paths for loading papers and matches.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.load_paths --papers 10000 --matches 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+from pathlib import Path
+
+from backend.benchmarks.state_io import best_of, make_matches, make_papers
+from backend.epi_ape.models import MatchRecord, PaperRecord
+from backend.epi_ape.storage import StateStore
+from backend.epi_ape.utils import dump_json, json_backend, set_fsync
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--papers", type=int, default=10000)
+    parser.add_argument("--matches", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    set_fsync(False)
+    rng = random.Random(0)
+    papers = make_papers(args.papers, rng)
+    paper_rows = [paper.to_state_dict() for paper in papers]
+    match_rows = [
+        match.to_state_dict() for match in make_matches(args.matches, papers, rng)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = StateStore(Path(tmp) / "legacy")
+        legacy.init_dirs()
+        # A bare array, as written before the schema marker.
+        dump_json(legacy.papers_path, paper_rows)
+        current = StateStore(Path(tmp) / "current")
+        current.init_dirs()
+        current.save_papers(papers)
+
+        cases = [
+            (
+                "PaperRecord.from_dict",
+                len(paper_rows),
+                lambda: [PaperRecord.from_dict(row) for row in paper_rows],
+            ),
+            (
+                "PaperRecord.from_state_dict",
+                len(paper_rows),
+                lambda: [PaperRecord.from_state_dict(row) for row in paper_rows],
+            ),
+            ("load_papers, unversioned file", len(paper_rows), legacy.load_papers),
+            ("load_papers, schema 2", len(paper_rows), current.load_papers),
+            (
+                "iter_papers, unversioned file",
+                len(paper_rows),
+                lambda: list(legacy.iter_papers()),
+            ),
+            (
+                "iter_papers, schema 2",
+                len(paper_rows),
+                lambda: list(current.iter_papers()),
+            ),
+            (
+                "MatchRecord.from_dict",
+                len(match_rows),
+                lambda: [MatchRecord.from_dict(row) for row in match_rows],
+            ),
+            (
+                "MatchRecord.from_state_dict",
+                len(match_rows),
+                lambda: [MatchRecord.from_state_dict(row) for row in match_rows],
+            ),
+        ]
+
+        print(f"JSON backend: {json_backend()}, best of {args.repeat}")
+        print(f"{'case':<34}{'records':>9}{'ms':>9}{'us/record':>11}")
+        for name, count, fn in cases:
+            seconds = best_of(args.repeat, fn)
+            print(
+                f"{name:<34}{count:>9}{seconds * 1e3:>9.1f}"
+                f"{seconds * 1e6 / count:>11.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Measure memory per paper and per match for each in-memory representation.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.records --papers 10000 --matches 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import gc
+import random
+import tracemalloc
+from typing import Callable
+
+from backend.benchmarks.state_io import make_matches, make_papers
+from backend.epi_ape.matchtable import MatchTable
+from backend.epi_ape.models import MatchRecord, PaperRecord
+from backend.epi_ape.utils import dumps_json, loads_json
+
+
+@dataclasses.dataclass
+class LegacyMatchRecord:
+    """``MatchRecord`` as it was before slots, interning and coded fields."""
+
+    paper_a: str
+    paper_b: str
+    winner: str
+    date: str
+    judge_model: str
+    swapped_consistent: bool
+    rationale_short: str
+
+
+# ``PaperRecord`` with the same fields but a per-instance ``__dict__``.
+LegacyPaperRecord = dataclasses.make_dataclass(
+    "LegacyPaperRecord",
+    [
+        (
+            item.name,
+            item.type,
+            dataclasses.field(
+                default=item.default, default_factory=item.default_factory
+            ),
+        )
+        for item in dataclasses.fields(PaperRecord)
+    ],
+)
+
+
+def measure(build: Callable[[], object]) -> tuple[object, int]:
+    """Build a structure and return it with the bytes it still holds."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, held
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--papers", type=int, default=10000)
+    parser.add_argument("--matches", type=int, default=200000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    papers = make_papers(args.papers, rng)
+    # Serialized rows, so every representation starts from freshly parsed
+    # strings, as when loading state from disk.
+    paper_rows = [dumps_json(paper.to_state_dict()) for paper in papers]
+    match_rows = [
+        dumps_json(match.to_state_dict())
+        for match in make_matches(args.matches, papers, rng)
+    ]
+    del papers
+
+    def parsed(rows: list[bytes]):
+        return (loads_json(row) for row in rows)
+
+    cases = [
+        ("papers: dicts", len(paper_rows), lambda: list(parsed(paper_rows))),
+        (
+            "papers: dataclass with __dict__",
+            len(paper_rows),
+            lambda: [LegacyPaperRecord(**item) for item in parsed(paper_rows)],
+        ),
+        (
+            "papers: PaperRecord (slots)",
+            len(paper_rows),
+            lambda: [PaperRecord.from_dict(item) for item in parsed(paper_rows)],
+        ),
+        ("matches: dicts", len(match_rows), lambda: list(parsed(match_rows))),
+        (
+            "matches: dataclass with __dict__",
+            len(match_rows),
+            lambda: [LegacyMatchRecord(**item) for item in parsed(match_rows)],
+        ),
+        (
+            "matches: MatchRecord (slots)",
+            len(match_rows),
+            lambda: [MatchRecord.from_dict(item) for item in parsed(match_rows)],
+        ),
+        (
+            "matches: MatchTable",
+            len(match_rows),
+            lambda: MatchTable.from_matches(
+                MatchRecord.from_dict(item) for item in parsed(match_rows)
+            ),
+        ),
+    ]
+
+    print(f"{'representation':<36}{'records':>9}{'MB':>8}{'bytes/record':>14}")
+    for name, count, build in cases:
+        result, held = measure(build)
+        print(f"{name:<36}{count:>9}{held / 1e6:>8.1f}{held / count:>14.0f}")
+        del result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Time state and web data load/save with each available JSON backend.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.state_io --papers 10000 --matches 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from backend.epi_ape.models import MatchRecord, PaperRecord
+from backend.epi_ape.publish import publish_web_data
+from backend.epi_ape.storage import StateStore
+from backend.epi_ape.utils import (
+    dump_json,
+    load_json,
+    orjson,
+    set_fsync,
+    set_json_backend,
+)
+
+
+def make_papers(count: int, rng: random.Random) -> list[PaperRecord]:
+    papers = []
+    for idx in range(count):
+        source = "ai" if idx % 3 else "human"
+        papers.append(
+            PaperRecord(
+                id=f"{source}-{idx:06d}",
+                title=f"Effect of intervention {idx} on community outcomes",
+                source=source,
+                venue="EPI-APE" if source == "ai" else "Lancet Public Health",
+                track=rng.choice(["Infectious Disease", "Community Health"]),
+                method=rng.choice(["Cohort", "Difference-in-differences", "RCT"]),
+                year=rng.randint(2015, 2026),
+                paper_url=f"papers/{source}-{idx:06d}/paper.md",
+                status="tournament",
+                advisor_passes=rng.randint(0, 4),
+                advisor_total=4,
+                advisor_score=rng.uniform(50, 95),
+                reviewer_score=rng.uniform(50, 95),
+                review_recommendation="minor_revision",
+                integrity_flags=["none"],
+                mu=rng.gauss(25, 3),
+                sigma=rng.uniform(1, 8.333),
+                elo=rng.randint(1200, 1800),
+                matches_played=rng.randint(0, 200),
+                created_at="2026-01-01T00:00:00+00:00",
+                updated_at="2026-01-01T00:00:00+00:00",
+            )
+        )
+    return papers
+
+
+def make_matches(
+    count: int, papers: list[PaperRecord], rng: random.Random
+) -> list[MatchRecord]:
+    ids = [paper.id for paper in papers]
+    return [
+        MatchRecord.create(
+            paper_a=rng.choice(ids),
+            paper_b=rng.choice(ids),
+            winner=rng.choice(["paperA", "paperB", "tie"]),
+            date="2026-01-01T00:00:00+00:00",
+            judge_model="gemini-2.5-flash",
+            swapped_consistent=True,
+            rationale_short="Clearer identification strategy and sharper outcome.",
+        )
+        for _ in range(count)
+    ]
+
+
+def best_of(repeat: int, fn: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def size_of(path: Path) -> int:
+    if path.is_dir():
+        return sum(
+            item.stat().st_size
+            for item in path.iterdir()
+            if item.suffix in {".json", ".jsonl"}
+        )
+    return path.stat().st_size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--papers", type=int, default=10000)
+    parser.add_argument("--matches", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fsync", action="store_true", help="fsync like real runs")
+    args = parser.parse_args()
+
+    set_fsync(args.fsync)
+    rng = random.Random(0)
+    papers = make_papers(args.papers, rng)
+    matches = make_matches(args.matches, papers, rng)
+    backends = ["json"] + (["orjson"] if orjson is not None else [])
+
+    print(f"{args.papers} papers, {args.matches} matches, best of {args.repeat}")
+    print(f"{'case':<38}{'save s':>9}{'load s':>9}{'MB':>8}")
+    for backend in backends:
+        set_json_backend(backend)
+        with tempfile.TemporaryDirectory() as tmp:
+            store = StateStore(Path(tmp) / "state")
+            store.init_dirs()
+            rows = []
+
+            state = [paper.to_state_dict() for paper in papers]
+            for pretty in (True, False):
+                path = Path(tmp) / f"papers-{'indented' if pretty else 'compact'}.json"
+                rows.append(
+                    (
+                        f"papers.json {'indent=2' if pretty else 'compact'}",
+                        best_of(
+                            args.repeat,
+                            lambda: dump_json(path, state, pretty=pretty),
+                        ),
+                        best_of(args.repeat, lambda: load_json(path, [])),
+                        size_of(path),
+                    )
+                )
+            rows.append(
+                (
+                    "save_papers / load_papers",
+                    best_of(args.repeat, lambda: store.save_papers(papers)),
+                    best_of(args.repeat, store.load_papers),
+                    size_of(store.papers_path),
+                )
+            )
+            rows.append(
+                (
+                    "save_matches / load_matches",
+                    best_of(args.repeat, lambda: store.save_matches(matches)),
+                    best_of(args.repeat, store.load_matches),
+                    size_of(store.matches_dir),
+                )
+            )
+            web_dir = Path(tmp) / "data"
+            rows.append(
+                (
+                    "publish_web_data",
+                    best_of(
+                        args.repeat, lambda: publish_web_data(web_dir, papers, matches)
+                    ),
+                    None,
+                    size_of(web_dir),
+                )
+            )
+
+        for name, save, load, size in rows:
+            label = f"{backend}: {name}"
+            loaded = "-" if load is None else f"{load:.3f}"
+            print(f"{label:<38}{save:>9.3f}{loaded:>9}{size / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from .cache import ResponseCache
+from .llm import (
+    _coerce_provider_and_model,
+    chat_completion_body,
+    is_cached,
+    openai_base_url,
+    prime_responses,
+)
+from .resilience import default_resilience
+from .transport import HttpResponse, default_pool
+from .utils import ensure_dir, now_compact
+
+# Providers exposing the OpenAI Files + Batches endpoints, with the function
+# giving their base URL and the environment variable holding their key.
+BATCH_PROVIDERS: dict[str, tuple[Callable[[], str], str]] = {
+    "openai": (openai_base_url, "OPENAI_API_KEY"),
+}
+
+_PENDING = {"validating", "in_progress", "finalizing", "cancelling"}
+
+
+@dataclass
+class BatchJob:
+    provider: str
+    batch_id: str
+    status: str
+    submitted: int
+    completed: int = 0
+    failed: int = 0
+
+
+@dataclass
+class BatchStats:
+    jobs: list[BatchJob] = field(default_factory=list)
+    # One message per job that failed outright; its requests ran synchronously.
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def submitted(self) -> int:
+        return sum(job.submitted for job in self.jobs)
+
+    @property
+    def completed(self) -> int:
+        return sum(job.completed for job in self.jobs)
+
+
+class BatchClient:
+    """Minimal client for an OpenAI-compatible ``/files`` + ``/batches`` API."""
+
+    def __init__(
+        self,
+        provider: str,
+        base_url: str,
+        api_key: str,
+        timeout: float | None = None,
+    ) -> None:
+        self.provider = provider
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        body: bytes | None = None,
+        content_type: str = "application/json",
+    ) -> HttpResponse:
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        if body is not None:
+            headers["Content-Type"] = content_type
+        return default_resilience().call(
+            self.provider,
+            lambda: default_pool().request(
+                method,
+                f"{self.base_url}{path}",
+                headers=headers,
+                body=body,
+                timeout=self.timeout,
+            ),
+        )
+
+    def _json(self, method: str, path: str, payload: dict | None = None) -> dict:
+        body = None if payload is None else json.dumps(payload).encode("utf-8")
+        return json.loads(self._request(method, path, body).text())
+
+    def upload(self, filename: str, data: bytes) -> str:
+        boundary = uuid.uuid4().hex
+        body = (
+            (
+                f"--{boundary}\r\n"
+                'Content-Disposition: form-data; name="purpose"\r\n\r\n'
+                "batch\r\n"
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                "Content-Type: application/jsonl\r\n\r\n"
+            ).encode("utf-8")
+            + data
+            + f"\r\n--{boundary}--\r\n".encode("utf-8")
+        )
+        response = self._request(
+            "POST", "/files", body, f"multipart/form-data; boundary={boundary}"
+        )
+        return str(json.loads(response.text())["id"])
+
+    def create(self, input_file_id: str) -> dict:
+        return self._json(
+            "POST",
+            "/batches",
+            {
+                "input_file_id": input_file_id,
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h",
+            },
+        )
+
+    def retrieve(self, batch_id: str) -> dict:
+        return self._json("GET", f"/batches/{batch_id}")
+
+    def cancel(self, batch_id: str) -> dict:
+        return self._json("POST", f"/batches/{batch_id}/cancel", {})
+
+    def content(self, file_id: str) -> bytes:
+        return self._request("GET", f"/files/{file_id}/content").body
+
+
+class BatchRunner:
+    """Send a stage's prompts as provider batch jobs before the stage runs.
+
+    ``prefetch`` groups requests by provider, writes one JSONL job file per
+    provider under ``job_dir``, submits it and polls until the job finishes
+    or ``max_wait`` seconds pass. Completed responses are handed to
+    ``llm.prime_responses``, so the stage's own ``_chat_json`` calls pick them
+    up and results land on the same papers, in the same order, as with
+    synchronous calls. Requests for providers without a batch API, requests
+    already in the response cache, and anything a job did not return are left
+    to the normal synchronous path.
+    """
+
+    def __init__(
+        self,
+        job_dir: Path,
+        poll_interval: float = 30.0,
+        max_wait: float = 3600.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.job_dir = job_dir
+        self.poll_interval = poll_interval
+        self.max_wait = max_wait
+        self.sleep = sleep
+        self.stats = BatchStats()
+
+    def _client(self, provider: str) -> BatchClient | None:
+        entry = BATCH_PROVIDERS.get(provider)
+        if entry is None:
+            return None
+        base_url, key_env = entry
+        api_key = os.getenv(key_env, "").strip()
+        if not api_key:
+            return None
+        return BatchClient(provider, base_url(), api_key)
+
+    def prefetch(self, requests: Iterable[tuple[str, str, str]], stage: str) -> int:
+        """Batch ``(model_name, system_prompt, user_prompt)`` requests.
+
+        Returns how many responses were primed.
+        """
+        grouped: dict[str, dict[str, tuple[str, str, str, str]]] = {}
+        for model_name, system_prompt, user_prompt in requests:
+            provider, model = _coerce_provider_and_model(model_name)
+            if provider not in BATCH_PROVIDERS:
+                continue
+            if is_cached(provider, model, system_prompt, user_prompt):
+                continue
+            key = ResponseCache.key(provider, model, system_prompt, user_prompt)
+            grouped.setdefault(provider, {})[key] = (
+                provider,
+                model,
+                system_prompt,
+                user_prompt,
+            )
+
+        primed = 0
+        for provider, pending in grouped.items():
+            client = self._client(provider)
+            if client is None:
+                continue
+            try:
+                primed += self._run_job(client, stage, pending)
+            except Exception as exc:
+                # Whatever the job did not deliver goes through the sync path.
+                self.stats.errors.append(f"{provider} ({stage}): {exc}")
+        return primed
+
+    def _run_job(
+        self,
+        client: BatchClient,
+        stage: str,
+        pending: dict[str, tuple[str, str, str, str]],
+    ) -> int:
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": key,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": chat_completion_body(model, system_prompt, user_prompt),
+                },
+                ensure_ascii=True,
+            )
+            for key, (_, model, system_prompt, user_prompt) in pending.items()
+        ]
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+
+        ensure_dir(self.job_dir)
+        name = f"{now_compact()}-{stage}-{client.provider}"
+        (self.job_dir / f"{name}.jsonl").write_bytes(data)
+
+        file_id = client.upload(f"{name}.jsonl", data)
+        batch = client.create(file_id)
+        job = BatchJob(
+            provider=client.provider,
+            batch_id=str(batch["id"]),
+            status=str(batch.get("status", "")),
+            submitted=len(lines),
+        )
+        self.stats.jobs.append(job)
+
+        deadline = time.monotonic() + self.max_wait
+        while job.status in _PENDING:
+            if time.monotonic() >= deadline:
+                client.cancel(job.batch_id)
+                job.status = "timed_out"
+                break
+            self.sleep(self.poll_interval)
+            batch = client.retrieve(job.batch_id)
+            job.status = str(batch.get("status", ""))
+
+        # Expired or cancelled jobs can still carry partial output.
+        output_file_id = batch.get("output_file_id")
+        if not output_file_id:
+            job.failed = job.submitted
+            return 0
+
+        output = client.content(str(output_file_id))
+        (self.job_dir / f"{name}.output.jsonl").write_bytes(output)
+
+        bodies: dict[str, dict[str, Any]] = {}
+        for line in output.decode("utf-8", errors="replace").splitlines():
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                continue
+            response = item.get("response") or {}
+            key = item.get("custom_id")
+            if key in pending and response.get("status_code") == 200:
+                bodies[key] = response.get("body") or {}
+
+        prime_responses(bodies)
+        job.completed = len(bodies)
+        job.failed = job.submitted - job.completed
+        return len(bodies)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from .utils import ensure_dir
+
+
+class ResponseCache:
+    """Content-addressed store of parsed LLM JSON responses.
+
+    Entries live under ``cache_dir/<aa>/<sha256>.json``. Only successful
+    responses are stored, so failures are always retried on the next run.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_age_days: float = 30.0,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 86400.0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(provider: str, model: str, system_prompt: str, user_prompt: str) -> str:
+        material = json.dumps(
+            [provider, model, system_prompt, user_prompt], ensure_ascii=True
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _expired(self, stamp: float, now: float) -> bool:
+        return self.max_age_seconds > 0 and now - stamp > self.max_age_seconds
+
+    def _read(self, key: str) -> Any:
+        try:
+            entry = json.loads(self._path(key).read_text(encoding="utf-8"))
+            if not self._expired(float(entry.get("created_at", 0)), time.time()):
+                return entry.get("response")
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def contains(self, key: str) -> bool:
+        """Whether ``get`` would hit, without counting a hit or miss."""
+        return isinstance(self._read(key), dict)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        payload = self._read(key)
+        with self._lock:
+            if isinstance(payload, dict):
+                self.hits += 1
+                return payload
+            self.misses += 1
+        return None
+
+    def put(self, key: str, provider: str, model: str, payload: dict[str, Any]) -> None:
+        path = self._path(key)
+        ensure_dir(path.parent)
+        entry = {
+            "created_at": time.time(),
+            "provider": provider,
+            "model": model,
+            "response": payload,
+        }
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=True), encoding="utf-8")
+        os.replace(tmp, path)
+        with self._lock:
+            self.writes += 1
+
+    def evict(self) -> int:
+        """Drop expired entries, then the oldest ones until under ``max_bytes``."""
+        if not self.cache_dir.exists():
+            return 0
+
+        now = time.time()
+        removed = 0
+        live: list[tuple[float, int, Path]] = []
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if self._expired(stat.st_mtime, now):
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                live.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in live)
+        if self.max_bytes > 0 and total > self.max_bytes:
+            for _, size, path in sorted(live):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "writes": self.writes}
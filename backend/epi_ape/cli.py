@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import argparse
+from dataclasses import replace
 from pathlib import Path
 
 from .config import load_settings
 from .github_sync import sync_to_github
 from .pipeline import publish_only, run_cycle
+from .rerate import run_rerate
+from .scheduler import SCHEDULERS
 from .skills import audit_skills
-from .utils import ensure_dir
+from .utils import backup_path, corrupt_path, ensure_dir, take_restored_files
 
 
 ARTIFACT_SYNC_PATHS = ["backend/state", "data", "papers"]
@@ -63,19 +66,47 @@ def cmd_skills_audit() -> int:
     return 0
 
 
+def _print_restored_files() -> None:
+    for path in take_restored_files():
+        print(
+            f"- warning: {path} was unreadable and was restored from "
+            f"{backup_path(path)} (bad copy kept as {corrupt_path(path)})"
+        )
+
+
 def cmd_run_cycle(
     generate: int,
     matches: int,
     sync_github_after: bool,
     commit_message: str,
     all_files: bool,
+    concurrency: int | None = None,
+    no_cache: bool = False,
+    scheduler: str | None = None,
+    batch: bool = False,
+    pipelined: bool = False,
+    resume: bool = False,
 ) -> int:
     root = _root_dir()
     _load_env_files(root)
     settings = load_settings(root)
-    report = run_cycle(settings, generate_count=generate, match_count=matches)
+    if concurrency is not None:
+        settings = replace(settings, llm_concurrency=concurrency)
+    if no_cache:
+        settings = replace(settings, llm_cache_enabled=False)
+    if scheduler is not None:
+        settings = replace(settings, match_scheduler=scheduler)
+    if batch:
+        settings = replace(settings, llm_batch=True)
+    if pipelined:
+        settings = replace(settings, pipelined=True)
+    report = run_cycle(
+        settings, generate_count=generate, match_count=matches, resume=resume
+    )
 
     print("Cycle complete")
+    if report.resumed_after:
+        print(f"- resumed after stage: {report.resumed_after}")
     print(f"- loaded papers: {report.loaded_papers}")
     print(f"- added human benchmarks: {report.added_human_benchmarks}")
     print(f"- added ai ideas: {report.added_ai_ideas}")
@@ -83,6 +114,52 @@ def cmd_run_cycle(
     print(f"- advisor-reviewed papers: {report.advisor_touched}")
     print(f"- reviewer-reviewed papers: {report.reviewer_touched}")
     print(f"- new matches: {report.new_matches}")
+    if settings.llm_cache_enabled:
+        print(
+            f"- llm cache: {report.llm_cache_hits} hits, "
+            f"{report.llm_cache_misses} misses"
+        )
+    for provider, calls in report.llm_calls.items():
+        print(
+            f"- llm {provider}: {calls['calls']} calls "
+            f"({calls['ok']} ok, {calls['cache_hits']} cached, {calls['batched']} batched, "
+            f"{calls['failed']} failed, {calls['skipped']} skipped), "
+            f"p50 {calls['p50_ms']:.0f} ms, p95 {calls['p95_ms']:.0f} ms, "
+            f"{calls['prompt_tokens']}+{calls['completion_tokens']} tokens"
+        )
+    if report.batch_submitted:
+        print(
+            f"- batch jobs: {report.batch_completed}/{report.batch_submitted} "
+            "requests answered"
+        )
+    for error in report.batch_errors:
+        print(f"- batch job failed, ran synchronously instead: {error}")
+    if report.llm_fallbacks:
+        reasons = ", ".join(
+            f"{count} {reason}" for reason, count in report.llm_fallbacks.items()
+        )
+        print(
+            f"- llm fallbacks to seeded scores: "
+            f"{sum(report.llm_fallbacks.values())} ({reasons})"
+        )
+    for provider, seconds in report.llm_throttled_seconds.items():
+        print(f"- rate limit waits for {provider}: {seconds:.1f}s summed over calls")
+    for provider, trips in report.llm_circuit_trips.items():
+        print(f"- circuit breaker for {provider} opened {trips} time(s)")
+    if report.metrics_path is not None:
+        print(f"- call metrics: {report.metrics_path}")
+    if report.http_requests:
+        print(
+            f"- http: {report.http_requests} requests over "
+            f"{report.http_connections} connections"
+        )
+    if report.openalex_requests or report.openalex_cache_hits:
+        print(
+            f"- openalex: {report.openalex_requests} requests "
+            f"({report.openalex_revalidated} not modified), "
+            f"{report.openalex_cache_hits} served from cache"
+        )
+    _print_restored_files()
 
     if sync_github_after:
         print("Running GitHub sync...")
@@ -110,6 +187,60 @@ def cmd_publish() -> int:
     settings = load_settings(root)
     publish_only(settings)
     print("Published web data to data/papers.json and data/matches.json")
+    _print_restored_files()
+    return 0
+
+
+def cmd_rerate(
+    checkpoint_every: int,
+    exclude_judges: list[str],
+    method: str | None,
+    from_scratch: bool,
+    publish: bool,
+    force: bool,
+) -> int:
+    root = _root_dir()
+    _load_env_files(root)
+    settings = load_settings(root)
+    report = run_rerate(
+        settings,
+        checkpoint_every=checkpoint_every,
+        exclude_judges=tuple(exclude_judges),
+        method=method,
+        from_scratch=from_scratch,
+        publish=publish,
+        force=force,
+    )
+
+    if not report.written:
+        print(
+            f"Not rerating: the match history is missing matches for "
+            f"{len(report.incomplete)} papers"
+        )
+        for paper_id, stored, found in report.incomplete:
+            print(f"- {paper_id}: {stored} matches played, {found} in the history")
+        print("Ratings were left unchanged. Use --force to rebuild them anyway.")
+        _print_restored_files()
+        return 1
+
+    print(f"Rerated {report.papers} papers with {report.method}")
+    print(f"- matches in history: {report.matches_total}")
+    print(f"- resumed from match: {report.resumed_from}")
+    print(f"- matches applied: {report.matches_applied}")
+    print(f"- matches skipped (unknown papers): {report.matches_skipped}")
+    print(f"- checkpoints written: {report.checkpoints_written}")
+    if report.incomplete:
+        print(
+            f"- warning: forced past {len(report.incomplete)} papers with missing "
+            "history; their matches played were reset to the replayed counts"
+        )
+    if report.anchored:
+        print(
+            f"- warning: guessed and stored seeded benchmark priors for "
+            f"{len(report.anchored)} papers that had none: "
+            + ", ".join(report.anchored)
+        )
+    _print_restored_files()
     return 0
 
 
@@ -167,9 +298,78 @@ def main() -> int:
         action="store_true",
         help="When syncing, include all changed files (default: artifacts only)",
     )
+    run_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Max parallel LLM calls per provider (default: EPI_APE_LLM_CONCURRENCY or 1)",
+    )
+    run_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the on-disk LLM response cache for this run",
+    )
+    run_parser.add_argument(
+        "--scheduler",
+        choices=SCHEDULERS,
+        default=None,
+        help="Tournament pairing (default: EPI_APE_MATCH_SCHEDULER or random)",
+    )
+    run_parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Send advisor/reviewer prompts as provider batch jobs (OpenAI-compatible)",
+    )
+    run_parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help="Review each paper as soon as its advisors pass it (needs --concurrency > 1)",
+    )
+    run_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted cycle from its last checkpoint",
+    )
 
     sub.add_parser("publish-web", help="Publish current state into web data files")
 
+    rerate_parser = sub.add_parser(
+        "rerate", help="Rebuild ratings by replaying the full match history"
+    )
+    rerate_parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=10000,
+        help="Write a rating checkpoint every N replayed matches",
+    )
+    rerate_parser.add_argument(
+        "--exclude-judge",
+        action="append",
+        default=[],
+        help="Ignore matches judged by this model (repeatable)",
+    )
+    rerate_parser.add_argument(
+        "--method",
+        choices=["trueskill", "elo"],
+        default=None,
+        help="Rating update (default: trueskill when installed, else elo)",
+    )
+    rerate_parser.add_argument(
+        "--from-scratch",
+        action="store_true",
+        help="Discard checkpoints and replay from the first match",
+    )
+    rerate_parser.add_argument(
+        "--no-publish",
+        action="store_true",
+        help="Do not republish web data after rerating",
+    )
+    rerate_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rerate even when papers have played more matches than the history holds",
+    )
+
     sync_parser = sub.add_parser(
         "sync-github", help="Commit and optionally push changes"
     )
@@ -200,9 +400,24 @@ def main() -> int:
             sync_github_after=args.sync_github,
             commit_message=args.commit_message,
             all_files=args.all_files,
+            concurrency=args.concurrency,
+            no_cache=args.no_cache,
+            scheduler=args.scheduler,
+            batch=args.batch,
+            pipelined=args.pipelined,
+            resume=args.resume,
         )
     if args.command == "publish-web":
         return cmd_publish()
+    if args.command == "rerate":
+        return cmd_rerate(
+            checkpoint_every=args.checkpoint_every,
+            exclude_judges=args.exclude_judge,
+            method=args.method,
+            from_scratch=args.from_scratch,
+            publish=not args.no_publish,
+            force=args.force,
+        )
     if args.command == "sync-github":
         return cmd_sync_github(
             push=args.push,
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from .llm import provider_name
+
+
+class LLMExecutor:
+    """Runs blocking LLM calls on one bounded thread pool per provider.
+
+    With ``max_workers <= 1`` calls run inline at submit time, which keeps
+    the serial call order of the original stages.
+    """
+
+    def __init__(
+        self, max_workers: int = 1, provider_limits: dict[str, int] | None = None
+    ) -> None:
+        self.max_workers = max(1, int(max_workers))
+        self.provider_limits = {
+            provider: max(1, int(limit))
+            for provider, limit in (provider_limits or {}).items()
+        }
+        self._pools: dict[str, ThreadPoolExecutor] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def concurrent(self) -> bool:
+        return self.max_workers > 1
+
+    def _pool_for(self, provider: str) -> ThreadPoolExecutor:
+        with self._lock:
+            pool = self._pools.get(provider)
+            if pool is None:
+                size = min(
+                    self.max_workers,
+                    self.provider_limits.get(provider, self.max_workers),
+                )
+                pool = ThreadPoolExecutor(
+                    max_workers=size, thread_name_prefix=f"epi-ape-{provider}"
+                )
+                self._pools[provider] = pool
+            return pool
+
+    def submit(
+        self, model_name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Future:
+        if not self.concurrent:
+            future: Future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as exc:
+                # KeyboardInterrupt and SystemExit propagate to the stage.
+                future.set_exception(exc)
+            return future
+
+        return self._pool_for(provider_name(model_name)).submit(fn, *args, **kwargs)
+
+    def shutdown(self, cancel_futures: bool = False) -> None:
+        """Wait for running calls; with ``cancel_futures`` drop queued ones."""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.shutdown(wait=True, cancel_futures=cancel_futures)
+
+    def __enter__(self) -> "LLMExecutor":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        self.shutdown(cancel_futures=exc_type is not None)
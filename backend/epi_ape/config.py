@@ -4,19 +4,55 @@ import os
 from dataclasses import dataclass
 from pathlib import Path
 
+from .scheduler import SCHEDULERS
+from .storage import STATE_BACKENDS
+
 
 @dataclass(frozen=True)
 class Settings:
     root_dir: Path
     state_dir: Path
+    # Local working files (caches, metrics, checkpoints) that are never
+    # committed; kept out of ``state_dir``, which the workflow commits.
+    cache_dir: Path
     papers_dir: Path
     web_data_dir: Path
+    state_backend: str
 
     generator_model: str
     judge_model: str
     advisor_models: tuple[str, ...]
     reviewer_models: tuple[str, ...]
 
+    llm_concurrency: int
+    generation_workers: int
+    provider_concurrency: dict[str, int]
+
+    llm_cache_enabled: bool
+    llm_cache_max_mb: int
+    llm_cache_max_age_days: int
+    provider_rpm: dict[str, int]
+    provider_tpm: dict[str, int]
+    llm_max_attempts: int
+    llm_batch: bool
+    pipelined: bool
+    pipeline_queue_size: int
+    llm_batch_poll_seconds: float
+    llm_batch_max_wait: float
+    llm_breaker_threshold: int
+    llm_breaker_cooldown: float
+
+    checkpoint_every_matches: int
+    state_fsync: bool
+
+    match_scheduler: str
+    target_sigma: float
+    title_similarity: float
+
+    http_pool_size: int
+    http_timeout: float
+    openalex_cache_ttl_hours: int
+
     github_remote: str
     github_branch: str
 
@@ -27,16 +63,66 @@ def _csv(name: str, default: str) -> tuple[str, ...]:
     return tuple(part for part in items if part)
 
 
+def _int(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+def _float(name: str, default: float) -> float:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+def _choice(name: str, default: str, choices: tuple[str, ...]) -> str:
+    value = os.getenv(name, "").strip().lower() or default
+    if value not in choices:
+        raise ValueError(f"{name}={value!r} is not one of {', '.join(choices)}")
+    return value
+
+
+def _flag(name: str, default: bool) -> bool:
+    raw = os.getenv(name, "").strip().lower()
+    if not raw:
+        return default
+    return raw not in {"0", "false", "no", "off"}
+
+
+def _provider_map(name: str, default: str = "") -> dict[str, int]:
+    mapping: dict[str, int] = {}
+    for item in _csv(name, default):
+        provider, sep, value = item.partition("=")
+        if not sep:
+            continue
+        try:
+            mapping[provider.strip().lower()] = int(value)
+        except ValueError:
+            continue
+    return mapping
+
+
 def load_settings(root_dir: Path) -> Settings:
     state_dir = root_dir / "backend" / "state"
+    cache_dir = root_dir / "backend" / ".cache"
     papers_dir = root_dir / "papers"
     web_data_dir = root_dir / "data"
 
     return Settings(
         root_dir=root_dir,
         state_dir=state_dir,
+        cache_dir=cache_dir,
         papers_dir=papers_dir,
         web_data_dir=web_data_dir,
+        state_backend=_choice("EPI_APE_STATE_BACKEND", "json", STATE_BACKENDS),
         generator_model=os.getenv("EPI_APE_GENERATOR_MODEL", "claude-sonnet-4.5"),
         judge_model=os.getenv("EPI_APE_JUDGE_MODEL", "gemini-2.5-flash"),
         advisor_models=_csv(
@@ -47,6 +133,30 @@ def load_settings(root_dir: Path) -> Settings:
             "EPI_APE_REVIEWER_MODELS",
             "openai:gpt-4.1,gemini:gemini-2.5-flash,xai:grok-4-fast",
         ),
+        llm_concurrency=_int("EPI_APE_LLM_CONCURRENCY", 1),
+        generation_workers=_int("EPI_APE_GENERATION_WORKERS", 1),
+        provider_concurrency=_provider_map("EPI_APE_PROVIDER_CONCURRENCY"),
+        llm_cache_enabled=_flag("EPI_APE_LLM_CACHE", True),
+        llm_cache_max_mb=_int("EPI_APE_LLM_CACHE_MAX_MB", 256),
+        llm_cache_max_age_days=_int("EPI_APE_LLM_CACHE_MAX_AGE_DAYS", 30),
+        provider_rpm=_provider_map("EPI_APE_PROVIDER_RPM"),
+        provider_tpm=_provider_map("EPI_APE_PROVIDER_TPM"),
+        llm_max_attempts=_int("EPI_APE_LLM_MAX_ATTEMPTS", 3),
+        llm_breaker_threshold=_int("EPI_APE_LLM_BREAKER_THRESHOLD", 5),
+        llm_breaker_cooldown=_float("EPI_APE_LLM_BREAKER_COOLDOWN", 60.0),
+        llm_batch=_flag("EPI_APE_LLM_BATCH", False),
+        pipelined=_flag("EPI_APE_PIPELINED", False),
+        pipeline_queue_size=_int("EPI_APE_PIPELINE_QUEUE_SIZE", 8),
+        llm_batch_poll_seconds=_float("EPI_APE_LLM_BATCH_POLL_SECONDS", 30.0),
+        llm_batch_max_wait=_float("EPI_APE_LLM_BATCH_MAX_WAIT", 3600.0),
+        checkpoint_every_matches=_int("EPI_APE_CHECKPOINT_MATCHES", 10),
+        state_fsync=_flag("EPI_APE_STATE_FSYNC", True),
+        match_scheduler=_choice("EPI_APE_MATCH_SCHEDULER", "random", SCHEDULERS),
+        target_sigma=_float("EPI_APE_TARGET_SIGMA", 0.0),
+        title_similarity=_float("EPI_APE_TITLE_SIMILARITY", 0.8),
+        http_pool_size=_int("EPI_APE_HTTP_POOL_SIZE", 8),
+        http_timeout=_float("EPI_APE_HTTP_TIMEOUT", 60.0),
+        openalex_cache_ttl_hours=_int("EPI_APE_OPENALEX_TTL_HOURS", 24),
         github_remote=os.getenv("EPI_APE_GITHUB_REMOTE", "origin"),
         github_branch=os.getenv("EPI_APE_GITHUB_BRANCH", ""),
     )
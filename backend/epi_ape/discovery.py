@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import math
+import random
 from itertools import cycle
+from typing import Iterator
 
+from .ids import IdAllocator, allocator_for
 from .models import PaperRecord, utc_now_iso
-from .utils import get_json, seeded_random
+from .openalex import OpenAlexClient
+from .titleindex import TitleIndex, index_for
+from .utils import seeded_random
 
 
 TRACKS = [
@@ -26,6 +32,46 @@ METHODS = [
 ]
 
 
+IDEA_INTERVENTIONS = [
+    "heat alert policy",
+    "community clinic weekend opening",
+    "bus fare subsidy for outpatient follow-up",
+    "mobile vaccine campaign",
+    "clean cooking transition",
+    "school air filtration mandate",
+    "housing retrofit program",
+    "water chlorination enforcement",
+    "telehealth parity expansion",
+    "community pharmacy hypertension bundle",
+]
+
+
+IDEA_OUTCOMES = [
+    "respiratory hospitalization",
+    "diabetes continuity of care",
+    "maternal visit completion",
+    "outbreak response delay",
+    "preventive screening uptake",
+    "heatstroke mortality",
+    "emergency department congestion",
+    "vaccine booster equity",
+]
+
+
+IDEA_GEOGRAPHIES = [
+    "urban districts",
+    "rural counties",
+    "border municipalities",
+    "low-income neighborhoods",
+    "informal settlements",
+]
+
+
+_INTERVENTION_INDEX = {name: i for i, name in enumerate(IDEA_INTERVENTIONS)}
+_OUTCOME_INDEX = {name: i for i, name in enumerate(IDEA_OUTCOMES)}
+_GEOGRAPHY_INDEX = {name: i for i, name in enumerate(IDEA_GEOGRAPHIES)}
+
+
 def infer_track(title: str) -> str:
     text = title.lower()
     if any(
@@ -62,40 +108,30 @@ def infer_method(title: str) -> str:
     return METHODS[rnd.randrange(len(METHODS))]
 
 
-def _next_id(existing: list[PaperRecord], prefix: str) -> str:
-    values = []
-    for paper in existing:
-        if paper.id.startswith(prefix):
-            tail = paper.id.split("_")[-1]
-            if tail.isdigit():
-                values.append(int(tail))
+OPENALEX_QUERIES = [
+    "epidemiology policy evaluation",
+    "community health intervention",
+    "spatial epidemiology health inequality",
+]
+OPENALEX_FILTER = "type:article,is_retracted:false,from_publication_date:2019-01-01"
+OPENALEX_SORT = "cited_by_count:desc"
 
-    nxt = max(values, default=0) + 1
-    return f"{prefix}_{nxt:04d}"
 
-
-def _fetch_openalex_benchmarks(limit: int = 20) -> list[dict]:
-    queries = [
-        "epidemiology policy evaluation",
-        "community health intervention",
-        "spatial epidemiology health inequality",
-    ]
+def _fetch_openalex_benchmarks(
+    limit: int = 20, client: OpenAlexClient | None = None
+) -> list[dict]:
+    client = client or OpenAlexClient()
+    # All queries run at once; merging in query order keeps the result
+    # independent of which response arrives first.
+    per_query = client.search_many(
+        OPENALEX_QUERIES, OPENALEX_FILTER, OPENALEX_SORT, limit
+    )
 
     items: list[dict] = []
     seen_titles: set[str] = set()
 
-    for query in queries:
-        payload = get_json(
-            "https://api.openalex.org/works",
-            {
-                "search": query,
-                "filter": "type:article,is_retracted:false,from_publication_date:2019-01-01",
-                "per-page": "15",
-                "sort": "cited_by_count:desc",
-            },
-        )
-
-        for work in payload.get("results", []):
+    for results in per_query:
+        for work in results:
             title = (work.get("title") or "").strip()
             if not title:
                 continue
@@ -142,8 +178,21 @@ def _fallback_human_papers() -> list[dict]:
     ]
 
 
+def benchmark_priors() -> Iterator[tuple[float, float, int]]:
+    """Seeded ``(mu, sigma, elo)`` priors, in the order discovery assigns them."""
+    rng = seeded_random("human-benchmark")
+    for base in cycle([34.0, 33.4, 32.7, 31.9, 31.2, 30.8, 30.1]):
+        mu = base + rng.uniform(-0.6, 0.6)
+        sigma = rng.uniform(0.9, 1.4)
+        yield mu, sigma, int(1500 + (mu - 25.0) * 32)
+
+
 def discover_human_benchmarks(
-    existing: list[PaperRecord], target_additions: int = 6
+    existing: list[PaperRecord],
+    target_additions: int = 6,
+    ids: IdAllocator | None = None,
+    openalex: OpenAlexClient | None = None,
+    titles: TitleIndex | None = None,
 ) -> list[PaperRecord]:
     current = [paper for paper in existing if paper.source == "human"]
     if len(current) >= target_additions:
@@ -153,7 +202,9 @@ def discover_human_benchmarks(
     found: list[dict] = []
 
     try:
-        openalex_items = _fetch_openalex_benchmarks(limit=max(10, to_add * 2))
+        openalex_items = _fetch_openalex_benchmarks(
+            limit=max(10, to_add * 2), client=openalex
+        )
         for work in openalex_items:
             venue = (
                 work.get("primary_location", {})
@@ -173,10 +224,10 @@ def discover_human_benchmarks(
     if not found:
         found = _fallback_human_papers()
 
-    rng = seeded_random("human-benchmark")
-    score_base = cycle([34.0, 33.4, 32.7, 31.9, 31.2, 30.8, 30.1])
+    ids = allocator_for(existing, ids)
+    priors = benchmark_priors()
 
-    title_seen = {paper.title.casefold() for paper in existing}
+    titles = index_for(existing, titles)
     additions: list[PaperRecord] = []
 
     for raw in found:
@@ -186,18 +237,15 @@ def discover_human_benchmarks(
         title = raw["title"].strip()
         if not title:
             continue
-        if title.casefold() in title_seen:
+        # Reworded or re-punctuated copies of a known title count as seen.
+        if titles.find_similar(title) is not None:
             continue
 
-        title_seen.add(title.casefold())
-
-        mu = next(score_base) + rng.uniform(-0.6, 0.6)
-        sigma = rng.uniform(0.9, 1.4)
-        elo = int(1500 + (mu - 25.0) * 32)
+        mu, sigma, elo = next(priors)
 
         additions.append(
             PaperRecord(
-                id=_next_id(existing + additions, "epi_h"),
+                id=ids.next_id("epi_h"),
                 title=title,
                 source="human",
                 venue=raw["venue"],
@@ -209,6 +257,9 @@ def discover_human_benchmarks(
                 mu=mu,
                 sigma=sigma,
                 elo=elo,
+                prior_mu=mu,
+                prior_sigma=sigma,
+                prior_elo=elo,
                 advisor_passes=4,
                 advisor_total=4,
                 advisor_score=95.0,
@@ -218,73 +269,93 @@ def discover_human_benchmarks(
                 updated_at=utc_now_iso(),
             )
         )
+        titles.add(additions[-1].id, title)
 
     return additions
 
 
-def propose_ai_ideas(existing: list[PaperRecord], count: int = 5) -> list[PaperRecord]:
-    interventions = [
-        "heat alert policy",
-        "community clinic weekend opening",
-        "bus fare subsidy for outpatient follow-up",
-        "mobile vaccine campaign",
-        "clean cooking transition",
-        "school air filtration mandate",
-        "housing retrofit program",
-        "water chlorination enforcement",
-        "telehealth parity expansion",
-        "community pharmacy hypertension bundle",
-    ]
+def _idea_title(index: int) -> str:
+    rest, geography = divmod(index, len(IDEA_GEOGRAPHIES))
+    intervention, outcome = divmod(rest, len(IDEA_OUTCOMES))
+    return (
+        f"{IDEA_INTERVENTIONS[intervention].title()} and "
+        f"{IDEA_OUTCOMES[outcome].title()} in {IDEA_GEOGRAPHIES[geography].title()}"
+    )
 
-    outcomes = [
-        "respiratory hospitalization",
-        "diabetes continuity of care",
-        "maternal visit completion",
-        "outbreak response delay",
-        "preventive screening uptake",
-        "heatstroke mortality",
-        "emergency department congestion",
-        "vaccine booster equity",
-    ]
 
-    geos = [
-        "urban districts",
-        "rural counties",
-        "border municipalities",
-        "low-income neighborhoods",
-        "informal settlements",
-    ]
+def _idea_index(title: str) -> int | None:
+    """Position of a proposed idea title in the idea space, or None."""
+    head, _, geography = title.casefold().rpartition(" in ")
+    intervention, _, outcome = head.partition(" and ")
+    try:
+        return (
+            _INTERVENTION_INDEX[intervention] * len(IDEA_OUTCOMES)
+            + _OUTCOME_INDEX[outcome]
+        ) * len(IDEA_GEOGRAPHIES) + _GEOGRAPHY_INDEX[geography]
+    except KeyError:
+        return None
+
+
+def _permutation(size: int, rnd: random.Random) -> Iterator[int]:
+    """Every index below ``size`` once, in a seeded order, in O(1) per step.
+
+    ``k -> (step * k + offset) % size`` is a bijection on ``range(size)``
+    whenever ``step`` is coprime to ``size``.
+    """
+    step, offset = 1, 0
+    if size > 1:
+        step = rnd.randrange(1, size)
+        while math.gcd(step, size) != 1:
+            step = rnd.randrange(1, size)
+        offset = rnd.randrange(size)
+    for k in range(size):
+        yield (step * k + offset) % size
+
+
+def propose_ai_ideas(
+    existing: list[PaperRecord],
+    count: int = 5,
+    ids: IdAllocator | None = None,
+    titles: TitleIndex | None = None,
+) -> list[PaperRecord]:
+    """Up to ``count`` unused intervention x outcome x geography ideas.
 
-    methods = METHODS
+    Combinations are visited in one fixed seeded order, skipping those whose
+    title is already in ``existing``, so fewer than ``count`` come back only
+    once the idea space is used up.
+    """
     track_cycle = cycle(TRACKS)
     rnd = seeded_random("ai-idea-proposals")
 
-    existing_titles = {paper.title.casefold() for paper in existing}
+    ids = allocator_for(existing, ids)
+    titles = index_for(existing, titles)
+    size = len(IDEA_INTERVENTIONS) * len(IDEA_OUTCOMES) * len(IDEA_GEOGRAPHIES)
+    used = bytearray(size)
+    for paper in existing:
+        index = _idea_index(paper.title)
+        if index is not None:
+            used[index] = 1
     additions: list[PaperRecord] = []
-    attempts = 0
-
-    while len(additions) < count and attempts < 200:
-        attempts += 1
-        intervention = rnd.choice(interventions)
-        outcome = rnd.choice(outcomes)
-        geography = rnd.choice(geos)
-        track = next(track_cycle)
-        method = rnd.choice(methods)
-        title = f"{intervention.title()} and {outcome.title()} in {geography.title()}"
-
-        key = title.casefold()
-        if key in existing_titles:
+
+    for index in _permutation(size, rnd):
+        if len(additions) >= count:
+            break
+        if used[index]:
+            continue
+
+        used[index] = 1
+        title = _idea_title(index)
+        if titles.find_similar(title) is not None:
             continue
 
-        existing_titles.add(key)
         additions.append(
             PaperRecord(
-                id=_next_id(existing + additions, "epi_a"),
+                id=ids.next_id("epi_a"),
                 title=title,
                 source="ai",
                 venue="EPI-APE Candidate",
-                track=track,
-                method=method,
+                track=next(track_cycle),
+                method=rnd.choice(METHODS),
                 year=2026,
                 paper_url="#",
                 status="idea",
@@ -296,5 +367,6 @@ def propose_ai_ideas(existing: list[PaperRecord], count: int = 5) -> list[PaperR
                 updated_at=utc_now_iso(),
             )
         )
+        titles.add(additions[-1].id, title)
 
     return additions
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
 import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from .models import PaperRecord, utc_now_iso
-from .utils import ensure_dir
+from .utils import ensure_dir, fsync_dir, fsync_file
+
+WORKSPACE_DIRS = ("scripts", "data", "outputs")
 
 
 def _paper_numeric_id(paper_id: str) -> int:
@@ -12,22 +18,16 @@ def _paper_numeric_id(paper_id: str) -> int:
     return int(tail) if tail.isdigit() else 0
 
 
-def _next_version_dir(papers_root: Path, paper_id: str) -> tuple[Path, int]:
-    paper_root = papers_root / paper_id
-    ensure_dir(paper_root)
-
+def _next_version(paper_root: Path) -> int:
     versions = []
     for entry in paper_root.iterdir():
+        # Staging directories start with "." and are never counted.
         if not entry.is_dir() or not entry.name.startswith("v"):
             continue
         suffix = entry.name[1:]
         if suffix.isdigit():
             versions.append(int(suffix))
-
-    nxt = max(versions, default=0) + 1
-    version_dir = paper_root / f"v{nxt}"
-    ensure_dir(version_dir)
-    return version_dir, nxt
+    return max(versions, default=0) + 1
 
 
 def _starter_paper_markdown(paper: PaperRecord, version: int) -> str:
@@ -142,26 +142,7 @@ def _integrity_yaml() -> str:
 """
 
 
-def generate_one(papers_root: Path, paper: PaperRecord) -> None:
-    version_dir, version = _next_version_dir(papers_root, paper.id)
-    scripts_dir = version_dir / "scripts"
-    data_dir = version_dir / "data"
-    outputs_dir = version_dir / "outputs"
-
-    ensure_dir(scripts_dir)
-    ensure_dir(data_dir)
-    ensure_dir(outputs_dir)
-
-    (version_dir / "paper.md").write_text(
-        _starter_paper_markdown(paper, version),
-        encoding="utf-8",
-    )
-    (scripts_dir / "analysis.R").write_text(
-        _starter_analysis_r(paper), encoding="utf-8"
-    )
-    (data_dir / "DATA_MANIFEST.md").write_text(_data_manifest(), encoding="utf-8")
-    (version_dir / "integrity.yml").write_text(_integrity_yaml(), encoding="utf-8")
-
+def _workspace_files(paper: PaperRecord, version: int) -> dict[str, str]:
     metadata = {
         "paper_id": paper.id,
         "version": version,
@@ -170,9 +151,58 @@ def generate_one(papers_root: Path, paper: PaperRecord) -> None:
         "status": "draft",
         "created_at": utc_now_iso(),
     }
-    (version_dir / "metadata.json").write_text(
-        json.dumps(metadata, indent=2), encoding="utf-8"
-    )
+    return {
+        "paper.md": _starter_paper_markdown(paper, version),
+        "scripts/analysis.R": _starter_analysis_r(paper),
+        "data/DATA_MANIFEST.md": _data_manifest(),
+        "integrity.yml": _integrity_yaml(),
+        "metadata.json": json.dumps(metadata, indent=2),
+    }
+
+
+def _write_workspace(staging: Path, files: dict[str, str]) -> None:
+    for subdir in WORKSPACE_DIRS:
+        ensure_dir(staging / subdir)
+    for name, text in files.items():
+        with (staging / name).open("wb") as handle:
+            handle.write(text.encode("utf-8"))
+            fsync_file(handle)
+
+
+def _build_version_dir(papers_root: Path, paper: PaperRecord) -> tuple[Path, int]:
+    """Create the paper's next ``vN`` workspace, complete or not at all.
+
+    The files are written to a hidden staging directory beside the versions
+    and renamed into place, which fails rather than merging when another
+    writer took ``vN`` first; the version is then bumped and the rename
+    retried.
+    """
+    paper_root = papers_root / paper.id
+    ensure_dir(paper_root)
+    version = _next_version(paper_root)
+    staging = paper_root / f".v{version}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        _write_workspace(staging, _workspace_files(paper, version))
+        while True:
+            version_dir = paper_root / f"v{version}"
+            try:
+                os.rename(staging, version_dir)
+                break
+            except OSError:
+                if not version_dir.exists():
+                    raise
+            version = max(version + 1, _next_version(paper_root))
+            # The version number is part of the paper and its metadata.
+            _write_workspace(staging, _workspace_files(paper, version))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    fsync_dir(paper_root)
+    return version_dir, version
+
+
+def generate_one(papers_root: Path, paper: PaperRecord) -> None:
+    version_dir, version = _build_version_dir(papers_root, paper)
 
     paper.venue = f"EPI-APE Working Paper #{_paper_numeric_id(paper.id)} (v{version})"
     paper.paper_url = str(version_dir.relative_to(papers_root.parent)).replace(
@@ -183,14 +213,28 @@ def generate_one(papers_root: Path, paper: PaperRecord) -> None:
 
 
 def generate_batch(
-    papers_root: Path, papers: list[PaperRecord], max_count: int
+    papers_root: Path, papers: list[PaperRecord], max_count: int, workers: int = 1
 ) -> list[PaperRecord]:
+    """Write a draft workspace for up to ``max_count`` ideas.
+
+    With ``workers`` > 1 the workspaces are built on a thread pool; each
+    paper is only touched by the thread building it.
+    """
     candidates = [
         paper for paper in papers if paper.source == "ai" and paper.status == "idea"
     ]
     selected = candidates[:max_count]
 
-    for paper in selected:
-        generate_one(papers_root, paper)
+    if workers <= 1 or len(selected) <= 1:
+        for paper in selected:
+            generate_one(papers_root, paper)
+        return selected
+
+    with ThreadPoolExecutor(
+        max_workers=min(workers, len(selected)), thread_name_prefix="epi-ape-generate"
+    ) as pool:
+        futures = [pool.submit(generate_one, papers_root, paper) for paper in selected]
+    for future in futures:
+        future.result()
 
     return selected
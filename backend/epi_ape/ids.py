@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Callable, Iterable
+
+from .models import PaperRecord
+from .utils import dump_json, file_lock, load_json
+
+
+def format_id(prefix: str, number: int) -> str:
+    return f"{prefix}_{number:04d}"
+
+
+def highest_ids(papers: Iterable[PaperRecord]) -> dict[str, int]:
+    """Largest numeric tail per id prefix, e.g. ``{"epi_a": 16, "epi_h": 9}``."""
+    highest: dict[str, int] = {}
+    for paper in papers:
+        prefix, _, tail = paper.id.rpartition("_")
+        if prefix and tail.isdigit():
+            highest[prefix] = max(highest.get(prefix, 0), int(tail))
+    return highest
+
+
+class IdAllocator:
+    """Hands out monotonic ``<prefix>_NNNN`` paper ids in O(1).
+
+    Counters hold the last number given out per prefix. Without a path they
+    live in memory; with one they persist in that JSON file, and every
+    update re-reads and rewrites it under an exclusive lock on a hidden
+    sibling (``.ids.lock`` for ``ids.json``), so cycle workers sharing a
+    state directory never hand out the same id. Ids are never reused, even
+    when the paper holding one is not saved.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _update(self, change: Callable[[dict[str, int]], None]) -> dict[str, int]:
+        with self._lock:
+            if self.path is None:
+                change(self._counters)
+                return dict(self._counters)
+            with file_lock(self.path.with_name(f".{self.path.stem}.lock")):
+                raw = load_json(self.path, default={})
+                counters = {str(key): int(value) for key, value in raw.items()}
+                change(counters)
+                dump_json(self.path, counters)
+            return counters
+
+    def seed(self, papers: Iterable[PaperRecord]) -> None:
+        """Raise counters past every id already in ``papers`` (one scan)."""
+        highest = highest_ids(papers)
+
+        def raise_counters(counters: dict[str, int]) -> None:
+            for prefix, number in highest.items():
+                counters[prefix] = max(counters.get(prefix, 0), number)
+
+        self._update(raise_counters)
+
+    def next_id(self, prefix: str) -> str:
+        def increment(counters: dict[str, int]) -> None:
+            counters[prefix] = counters.get(prefix, 0) + 1
+
+        return format_id(prefix, self._update(increment)[prefix])
+
+
+def allocator_for(
+    papers: Iterable[PaperRecord], ids: IdAllocator | None
+) -> IdAllocator:
+    """``ids`` if given, else an in-memory allocator seeded from ``papers``."""
+    if ids is not None:
+        return ids
+    ids = IdAllocator()
+    ids.seed(papers)
+    return ids
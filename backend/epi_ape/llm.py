@@ -2,9 +2,20 @@ from __future__ import annotations
 
 import json
 import os
+import threading
+import time
 from dataclasses import dataclass
 from typing import Any
-from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+
+from .cache import ResponseCache
+from .metrics import CallRecord, MetricsRecorder
+from .ratelimit import default_limiter
+from .resilience import CircuitOpenError, default_resilience
+from .transport import default_pool
+
+# Tokens reserved for a reply before the provider reports actual usage.
+COMPLETION_TOKEN_ALLOWANCE = 256
 
 
 @dataclass
@@ -54,14 +65,86 @@ def _extract_json_text(raw_text: str) -> dict[str, Any] | None:
 
 
 def _post_json(
-    url: str, headers: dict[str, str], payload: dict[str, Any], timeout: int = 60
+    url: str,
+    headers: dict[str, str],
+    payload: dict[str, Any],
+    timeout: float | None = None,
+    trace: CallRecord | None = None,
 ) -> dict[str, Any]:
     data = json.dumps(payload).encode("utf-8")
-    request = Request(url, data=data, headers=headers, method="POST")
-    with urlopen(request, timeout=timeout) as response:
-        charset = response.headers.get_content_charset() or "utf-8"
-        text = response.read().decode(charset, errors="replace")
-    return json.loads(text)
+    try:
+        response = default_pool().request(
+            "POST", url, headers=headers, body=data, timeout=timeout
+        )
+    except HTTPError as exc:
+        if trace is not None:
+            trace.status = exc.code
+        raise
+
+    parsed = json.loads(response.text())
+    if trace is not None:
+        trace.status = response.status
+        trace.response_bytes = len(response.body)
+        if isinstance(parsed, dict):
+            _record_usage(trace, parsed)
+    return parsed
+
+
+def _send(
+    provider: str,
+    url: str,
+    headers: dict[str, str],
+    payload: dict[str, Any],
+    trace: CallRecord | None = None,
+) -> dict[str, Any]:
+    """POST through the provider's rate limits, retry policy and breaker."""
+    limiter = default_limiter()
+    estimate = _estimate_tokens(payload)
+
+    def attempt() -> dict[str, Any]:
+        waited = limiter.acquire(provider, estimate)
+        if trace is not None:
+            trace.throttle_ms = round(trace.throttle_ms + waited * 1000, 1)
+        return _post_json(url, headers, payload, trace=trace)
+
+    def note_retry(exc: BaseException, delay: float) -> None:
+        if trace is not None:
+            trace.retries += 1
+
+    parsed = default_resilience().call(provider, attempt, on_retry=note_retry)
+    if trace is not None and trace.prompt_tokens is not None:
+        limiter.settle(
+            provider,
+            estimate,
+            trace.prompt_tokens + (trace.completion_tokens or 0),
+        )
+    return parsed
+
+
+def _estimate_tokens(payload: dict[str, Any]) -> int:
+    # Roughly four characters per token, plus room for a short JSON answer.
+    return len(json.dumps(payload)) // 4 + COMPLETION_TOKEN_ALLOWANCE
+
+
+def _optional_int(value: Any) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _record_usage(trace: CallRecord, payload: dict[str, Any]) -> None:
+    # OpenAI-compatible providers report ``usage``; Gemini ``usageMetadata``.
+    usage = payload.get("usage")
+    if isinstance(usage, dict):
+        trace.prompt_tokens = _optional_int(usage.get("prompt_tokens"))
+        trace.completion_tokens = _optional_int(usage.get("completion_tokens"))
+        return
+
+    usage = payload.get("usageMetadata")
+    if isinstance(usage, dict):
+        trace.prompt_tokens = _optional_int(usage.get("promptTokenCount"))
+        trace.completion_tokens = _optional_int(usage.get("candidatesTokenCount"))
 
 
 def _coerce_provider_and_model(model_name: str) -> tuple[str, str]:
@@ -98,6 +181,10 @@ def _coerce_provider_and_model(model_name: str) -> tuple[str, str]:
     return "unknown", raw
 
 
+def provider_name(model_name: str) -> str:
+    return _coerce_provider_and_model(model_name)[0]
+
+
 def _extract_openai_text(payload: dict[str, Any]) -> str:
     choices = payload.get("choices", [])
     if not choices:
@@ -127,6 +214,22 @@ def _extract_gemini_text(payload: dict[str, Any]) -> str:
     return "\n".join(output)
 
 
+def openai_base_url() -> str:
+    return os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+
+
+def chat_completion_body(model: str, system_prompt: str, user_prompt: str) -> dict:
+    """Request body shared by the OpenAI-compatible providers and batch jobs."""
+    return {
+        "model": model,
+        "temperature": 0,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+    }
+
+
 def _gemini_keys() -> list[str]:
     keys: list[str] = []
     primary = os.getenv("GOOGLE_API_KEY", "").strip()
@@ -140,31 +243,151 @@ def _gemini_keys() -> list[str]:
     return keys
 
 
+_response_cache: ResponseCache | None = None
+
+
+def set_response_cache(cache: ResponseCache | None) -> None:
+    global _response_cache
+    _response_cache = cache
+
+
+_metrics: MetricsRecorder | None = None
+
+
+def set_metrics_recorder(recorder: MetricsRecorder | None) -> None:
+    global _metrics
+    _metrics = recorder
+
+
 def _chat_json(
-    model_name: str, system_prompt: str, user_prompt: str
+    model_name: str, system_prompt: str, user_prompt: str, stage: str = ""
 ) -> dict[str, Any] | None:
     provider, model = _coerce_provider_and_model(model_name)
+    trace = CallRecord(
+        provider=provider,
+        model=model,
+        stage=stage,
+        started_at=time.time(),
+        prompt_chars=len(system_prompt) + len(user_prompt),
+    )
+
+    started = time.perf_counter()
+    parsed = _chat_cached(provider, model, system_prompt, user_prompt, trace)
+    trace.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    if trace.outcome not in {"cache_hit", "batched"}:
+        if parsed is not None:
+            trace.outcome = "ok"
+        elif trace.status is not None and trace.status < 400:
+            trace.outcome = "unparsed"
+        elif not trace.error:
+            trace.outcome = "skipped"
+    trace.fallback = parsed is None
+
+    recorder = _metrics
+    if recorder is not None:
+        recorder.record(trace)
+    return parsed
+
+
+_prefetched: dict[str, dict[str, Any]] = {}
+_prefetched_lock = threading.Lock()
+
+
+def prime_responses(bodies: dict[str, dict[str, Any]]) -> None:
+    """Hold chat-completion bodies fetched ahead of time (e.g. by a batch job).
+
+    Keys are ``ResponseCache.key`` values; each body is used by at most one
+    ``_chat_json`` call with the same provider, model and prompts.
+    """
+    with _prefetched_lock:
+        _prefetched.update(bodies)
+
+
+def clear_prefetched() -> None:
+    with _prefetched_lock:
+        _prefetched.clear()
+
 
+def _take_prefetched(key: str) -> dict[str, Any] | None:
+    with _prefetched_lock:
+        return _prefetched.pop(key, None)
+
+
+def is_cached(provider: str, model: str, system_prompt: str, user_prompt: str) -> bool:
+    cache = _response_cache
+    if cache is None:
+        return False
+    return cache.contains(cache.key(provider, model, system_prompt, user_prompt))
+
+
+def _chat_cached(
+    provider: str,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    trace: CallRecord,
+) -> dict[str, Any] | None:
+    cache = _response_cache
+    key = ResponseCache.key(provider, model, system_prompt, user_prompt)
+
+    body = _take_prefetched(key)
+    if body is not None:
+        trace.status = 200
+        _record_usage(trace, body)
+        parsed = _extract_json_text(_extract_openai_text(body))
+        if parsed is not None:
+            trace.outcome = "batched"
+    else:
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                trace.outcome = "cache_hit"
+                return cached
+        parsed = _chat_provider(provider, model, system_prompt, user_prompt, trace)
+
+    if parsed is not None and cache is not None:
+        try:
+            cache.put(key, provider, model, parsed)
+        except OSError:
+            pass
+    return parsed
+
+
+def _record_error(trace: CallRecord | None, exc: Exception) -> None:
+    if trace is None:
+        return
+    if isinstance(exc, CircuitOpenError):
+        trace.outcome = "circuit_open"
+    elif isinstance(exc, HTTPError):
+        trace.outcome = "http_error"
+    else:
+        trace.outcome = "error"
+    trace.error = f"{type(exc).__name__}: {exc}"[:200]
+
+
+def _chat_provider(
+    provider: str,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    trace: CallRecord | None = None,
+) -> dict[str, Any] | None:
     try:
         if provider == "openai":
             key = os.getenv("OPENAI_API_KEY")
             if not key:
                 return None
 
-            payload = _post_json(
-                "https://api.openai.com/v1/chat/completions",
+            payload = _send(
+                provider,
+                f"{openai_base_url()}/chat/completions",
                 {
                     "Authorization": f"Bearer {key}",
                     "Content-Type": "application/json",
                 },
-                {
-                    "model": model,
-                    "temperature": 0,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                },
+                chat_completion_body(model, system_prompt, user_prompt),
+                trace=trace,
             )
             text = _extract_openai_text(payload)
             return _extract_json_text(text)
@@ -174,20 +397,15 @@ def _chat_json(
             if not key:
                 return None
 
-            payload = _post_json(
+            payload = _send(
+                provider,
                 "https://api.x.ai/v1/chat/completions",
                 {
                     "Authorization": f"Bearer {key}",
                     "Content-Type": "application/json",
                 },
-                {
-                    "model": model,
-                    "temperature": 0,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                },
+                chat_completion_body(model, system_prompt, user_prompt),
+                trace=trace,
             )
             text = _extract_openai_text(payload)
             return _extract_json_text(text)
@@ -197,9 +415,12 @@ def _chat_json(
             if not keys:
                 return None
 
-            for key in keys:
+            for attempt, key in enumerate(keys):
+                if attempt and trace is not None:
+                    trace.retries += 1
                 try:
-                    payload = _post_json(
+                    payload = _send(
+                        provider,
                         f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={key}",
                         {"Content-Type": "application/json"},
                         {
@@ -216,12 +437,14 @@ def _chat_json(
                                 "temperature": 0,
                             },
                         },
+                        trace=trace,
                     )
                     text = _extract_gemini_text(payload)
                     parsed = _extract_json_text(text)
                     if parsed is not None:
                         return parsed
-                except Exception:
+                except Exception as exc:
+                    _record_error(trace, exc)
                     continue
 
             return None
@@ -235,21 +458,16 @@ def _chat_json(
                 "GITHUB_MODELS_URL",
                 "https://models.inference.ai.azure.com/chat/completions",
             )
-            payload = _post_json(
+            payload = _send(
+                provider,
                 url,
                 {
                     "Authorization": f"Bearer {token}",
                     "api-key": token,
                     "Content-Type": "application/json",
                 },
-                {
-                    "model": model,
-                    "temperature": 0,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                },
+                chat_completion_body(model, system_prompt, user_prompt),
+                trace=trace,
             )
             text = _extract_openai_text(payload)
             return _extract_json_text(text)
@@ -259,26 +477,22 @@ def _chat_json(
             if not key:
                 return None
 
-            payload = _post_json(
+            payload = _send(
+                provider,
                 "https://api.deepseek.com/chat/completions",
                 {
                     "Authorization": f"Bearer {key}",
                     "Content-Type": "application/json",
                 },
-                {
-                    "model": model,
-                    "temperature": 0,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                },
+                chat_completion_body(model, system_prompt, user_prompt),
+                trace=trace,
             )
             text = _extract_openai_text(payload)
             return _extract_json_text(text)
 
         return None
-    except Exception:
+    except Exception as exc:
+        _record_error(trace, exc)
         return None
 
 
@@ -290,14 +504,13 @@ def _bound_score(value: Any, default: float = 0.0) -> float:
     return max(0.0, min(100.0, score))
 
 
-def advisor_evaluate(
-    model_name: str,
+def advisor_prompts(
     paper_title: str,
     paper_track: str,
     paper_method: str,
     integrity_flags: list[str],
     paper_excerpt: str,
-) -> AdvisorResult | None:
+) -> tuple[str, str]:
     system = (
         "You are a strict epidemiology methods advisor. "
         "Return JSON only with keys: pass (boolean), score (0-100), rationale (string)."
@@ -310,8 +523,10 @@ def advisor_evaluate(
         f"Excerpt:\n{paper_excerpt}\n\n"
         "Assess fatal risks in identification, data validity, reproducibility, and inference."
     )
+    return system, user
+
 
-    payload = _chat_json(model_name, system, user)
+def parse_advisor(payload: dict[str, Any] | None) -> AdvisorResult | None:
     if not payload:
         return None
 
@@ -321,14 +536,27 @@ def advisor_evaluate(
     return AdvisorResult(passed=passed, score=score, rationale=rationale)
 
 
-def reviewer_evaluate(
+def advisor_evaluate(
     model_name: str,
     paper_title: str,
     paper_track: str,
     paper_method: str,
     integrity_flags: list[str],
     paper_excerpt: str,
-) -> ReviewerResult | None:
+) -> AdvisorResult | None:
+    system, user = advisor_prompts(
+        paper_title, paper_track, paper_method, integrity_flags, paper_excerpt
+    )
+    return parse_advisor(_chat_json(model_name, system, user, stage="advisor"))
+
+
+def reviewer_prompts(
+    paper_title: str,
+    paper_track: str,
+    paper_method: str,
+    integrity_flags: list[str],
+    paper_excerpt: str,
+) -> tuple[str, str]:
     system = (
         "You are a top epidemiology reviewer. "
         "Return JSON only with keys: score (0-100), recommendation (accept|minor|major|r_and_r|reject), rationale (string)."
@@ -341,8 +569,10 @@ def reviewer_evaluate(
         f"Excerpt:\n{paper_excerpt}\n\n"
         "Score novelty, identification credibility, policy relevance, robustness depth, and writing clarity."
     )
+    return system, user
+
 
-    payload = _chat_json(model_name, system, user)
+def parse_reviewer(payload: dict[str, Any] | None) -> ReviewerResult | None:
     if not payload:
         return None
 
@@ -356,6 +586,20 @@ def reviewer_evaluate(
     )
 
 
+def reviewer_evaluate(
+    model_name: str,
+    paper_title: str,
+    paper_track: str,
+    paper_method: str,
+    integrity_flags: list[str],
+    paper_excerpt: str,
+) -> ReviewerResult | None:
+    system, user = reviewer_prompts(
+        paper_title, paper_track, paper_method, integrity_flags, paper_excerpt
+    )
+    return parse_reviewer(_chat_json(model_name, system, user, stage="reviewer"))
+
+
 def judge_pair(
     model_name: str,
     paper_a_title: str,
@@ -380,7 +624,7 @@ def judge_pair(
         "Prioritize identification, robustness, and policy significance."
     )
 
-    payload = _chat_json(model_name, system, user)
+    payload = _chat_json(model_name, system, user, stage="judge")
     if not payload:
         return None
 
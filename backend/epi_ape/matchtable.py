@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from array import array
+from typing import Iterable
+
+from .models import WINNERS, MatchRecord
+
+
+class MatchTable:
+    """Columnar match history for bulk analytics.
+
+    Each match is one slot in a set of typed ``array`` columns: paper and
+    judge references are indices into ``ids`` and ``judges``, outcomes use
+    the ``models`` codes and dates are UTC epoch seconds. Rationales are not
+    kept; stream ``MatchRecord``s when they are needed. The columns support
+    the buffer protocol, so ``numpy.frombuffer`` can view them without a copy.
+    """
+
+    def __init__(self) -> None:
+        self.ids: list[str] = []
+        self.judges: list[str] = []
+        self._id_index: dict[str, int] = {}
+        self._judge_index: dict[str, int] = {}
+        self.paper_a = array("I")
+        self.paper_b = array("I")
+        self.outcome = array("b")
+        self.timestamp = array("q")
+        self.judge = array("H")
+        self.swapped_consistent = array("B")
+
+    @classmethod
+    def from_matches(cls, matches: Iterable[MatchRecord]) -> "MatchTable":
+        table = cls()
+        table.extend(matches)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.outcome)
+
+    def _paper(self, paper_id: str) -> int:
+        idx = self._id_index.get(paper_id)
+        if idx is None:
+            idx = len(self.ids)
+            self._id_index[paper_id] = idx
+            self.ids.append(paper_id)
+        return idx
+
+    def _judge(self, judge_model: str) -> int:
+        idx = self._judge_index.get(judge_model)
+        if idx is None:
+            idx = len(self.judges)
+            self._judge_index[judge_model] = idx
+            self.judges.append(judge_model)
+        return idx
+
+    def append(self, match: MatchRecord) -> None:
+        self.paper_a.append(self._paper(match.paper_a))
+        self.paper_b.append(self._paper(match.paper_b))
+        self.outcome.append(match.outcome)
+        self.timestamp.append(match.timestamp)
+        self.judge.append(self._judge(match.judge_model))
+        self.swapped_consistent.append(1 if match.swapped_consistent else 0)
+
+    def extend(self, matches: Iterable[MatchRecord]) -> None:
+        for match in matches:
+            self.append(match)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the columns (the id and judge lists are shared)."""
+        columns = (
+            self.paper_a,
+            self.paper_b,
+            self.outcome,
+            self.timestamp,
+            self.judge,
+            self.swapped_consistent,
+        )
+        return sum(column.itemsize * len(column) for column in columns)
+
+    def outcome_counts(self) -> dict[str, int]:
+        counts = {winner: 0 for winner in WINNERS.values()}
+        for code in self.outcome:
+            counts[WINNERS[code]] += 1
+        return counts
+
+    def played(self) -> dict[str, int]:
+        """Matches per paper id."""
+        totals = [0] * len(self.ids)
+        for column in (self.paper_a, self.paper_b):
+            for idx in column:
+                totals[idx] += 1
+        return dict(zip(self.ids, totals))
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from .utils import ensure_dir
+
+
+@dataclass
+class CallRecord:
+    """One ``_chat_json`` call, as written to the per-cycle metrics file.
+
+    ``outcome`` is one of ``ok``, ``cache_hit``, ``batched`` (answered by a
+    provider batch job fetched before the stage ran), ``skipped`` (no request was
+    sent: missing credentials or unknown provider), ``circuit_open`` (the
+    provider's breaker failed the call fast), ``http_error``, ``error``
+    (transport or other exception) or ``unparsed`` (the provider answered but
+    no JSON object could be extracted). ``fallback`` marks calls that
+    returned nothing, so the stage used its seeded fallback score instead.
+    """
+
+    provider: str
+    model: str
+    stage: str
+    started_at: float = 0.0
+    latency_ms: float = 0.0
+    throttle_ms: float = 0.0
+    outcome: str = "ok"
+    status: int | None = None
+    retries: int = 0
+    prompt_chars: int = 0
+    response_bytes: int = 0
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    error: str = ""
+    fallback: bool = False
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    # Nearest-rank percentile; enough for a per-cycle summary.
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class MetricsRecorder:
+    """Thread-safe sink for call records, optionally appended to a JSONL file."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self.records: list[CallRecord] = []
+        self._lock = threading.Lock()
+
+    def record(self, call: CallRecord) -> None:
+        line = json.dumps(asdict(call), ensure_ascii=True) + "\n"
+        with self._lock:
+            self.records.append(call)
+            if self.path is not None:
+                ensure_dir(self.path.parent)
+                with self.path.open("a", encoding="utf-8") as handle:
+                    handle.write(line)
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """Per-provider call counts, token totals and p50/p95 latency.
+
+        Cache hits are counted but left out of the latency percentiles, which
+        describe time spent waiting on the provider.
+        """
+        with self._lock:
+            records = list(self.records)
+
+        grouped: dict[str, list[CallRecord]] = {}
+        for call in records:
+            grouped.setdefault(call.provider, []).append(call)
+
+        summary: dict[str, dict[str, Any]] = {}
+        for provider, calls in sorted(grouped.items()):
+            latencies = sorted(
+                call.latency_ms
+                for call in calls
+                if call.outcome not in {"cache_hit", "batched", "skipped"}
+            )
+            summary[provider] = {
+                "calls": len(calls),
+                "ok": sum(1 for call in calls if call.outcome == "ok"),
+                "cache_hits": sum(1 for call in calls if call.outcome == "cache_hit"),
+                "batched": sum(1 for call in calls if call.outcome == "batched"),
+                "skipped": sum(1 for call in calls if call.outcome == "skipped"),
+                "failed": sum(
+                    1
+                    for call in calls
+                    if call.outcome
+                    in {"http_error", "error", "unparsed", "circuit_open"}
+                ),
+                "retries": sum(call.retries for call in calls),
+                "throttle_ms": round(sum(call.throttle_ms for call in calls), 1),
+                "fallbacks": sum(1 for call in calls if call.fallback),
+                "prompt_tokens": sum(call.prompt_tokens or 0 for call in calls),
+                "completion_tokens": sum(call.completion_tokens or 0 for call in calls),
+                "p50_ms": round(_percentile(latencies, 0.50), 1),
+                "p95_ms": round(_percentile(latencies, 0.95), 1),
+            }
+        return summary
+
+    def fallback_reasons(self) -> dict[str, int]:
+        """How many calls fell back to seeded scores, by outcome."""
+        with self._lock:
+            records = list(self.records)
+        reasons: dict[str, int] = {}
+        for call in records:
+            if call.fallback:
+                reasons[call.outcome] = reasons.get(call.outcome, 0) + 1
+        return dict(sorted(reasons.items()))
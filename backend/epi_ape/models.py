@@ -1,15 +1,53 @@
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass, field
+import sys
+from dataclasses import asdict, dataclass, field, fields
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any
 
+# Match outcome codes, from paper_a's point of view.
+A_WINS = 1
+DRAW = 0
+B_WINS = -1
+
+WINNER_CODES = {"paperA": A_WINS, "paperB": B_WINS}
+WINNERS = {A_WINS: "paperA", B_WINS: "paperB", DRAW: "tie"}
+
 
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
 
 
-@dataclass
+def outcome_code(winner: str) -> int:
+    return WINNER_CODES.get(winner, DRAW)
+
+
+def epoch_seconds(value: str) -> int:
+    """Whole UTC seconds for an ISO 8601 timestamp (naive ones are UTC).
+
+    Raises ``ValueError`` naming the value when it is not a timestamp, rather
+    than storing it as the epoch.
+    """
+    try:
+        when = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"unparseable match date {value!r}") from None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return int(when.timestamp())
+
+
+@lru_cache(maxsize=4096)
+def iso_from_epoch(seconds: int) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat()
+
+
+def _optional(cast: Any, value: Any) -> Any:
+    return None if value is None else cast(value)
+
+
+@dataclass(slots=True)
 class PaperRecord:
     id: str
     title: str
@@ -32,6 +70,9 @@ class PaperRecord:
     sigma: float = 8.333
     elo: int = 1500
     matches_played: int = 0
+    prior_mu: float | None = None
+    prior_sigma: float | None = None
+    prior_elo: int | None = None
 
     contributor: str = "system"
     created_at: str = field(default_factory=utc_now_iso)
@@ -42,8 +83,10 @@ class PaperRecord:
 
     @classmethod
     def from_dict(cls, payload: dict[str, Any]) -> "PaperRecord":
+        created_at = payload.get("created_at", payload.get("createdAt"))
+        updated_at = payload.get("updated_at", payload.get("updatedAt"))
         return cls(
-            id=payload["id"],
+            id=sys.intern(payload["id"]),
             title=payload["title"],
             source=payload["source"],
             venue=payload.get("venue", "Unknown"),
@@ -76,15 +119,30 @@ class PaperRecord:
             matches_played=int(
                 payload.get("matches_played", payload.get("matchesPlayed", 0))
             ),
+            prior_mu=_optional(float, payload.get("prior_mu")),
+            prior_sigma=_optional(float, payload.get("prior_sigma")),
+            prior_elo=_optional(int, payload.get("prior_elo")),
             contributor=payload.get("contributor", "system"),
-            created_at=payload.get(
-                "created_at", payload.get("createdAt", utc_now_iso())
-            ),
-            updated_at=payload.get(
-                "updated_at", payload.get("updatedAt", utc_now_iso())
-            ),
+            created_at=created_at if created_at is not None else utc_now_iso(),
+            updated_at=updated_at if updated_at is not None else utc_now_iso(),
         )
 
+    @classmethod
+    def from_state_dict(cls, payload: dict[str, Any]) -> "PaperRecord":
+        """Fast path for rows written by ``to_state_dict`` in the current schema.
+
+        Field names and types are trusted as written; ``from_dict`` handles
+        older files and the web format.
+        """
+        # Keyword matching is slow for parsed (non-interned) key strings, so
+        # rows holding every field in order are passed positionally.
+        if tuple(payload) == _PAPER_FIELDS:
+            paper = cls(*payload.values())
+        else:
+            paper = cls(**payload)
+        paper.id = sys.intern(paper.id)
+        return paper
+
     def to_state_dict(self) -> dict[str, Any]:
         return asdict(self)
 
@@ -113,23 +171,61 @@ class PaperRecord:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class MatchRecord:
+    """One judged pair, stored compactly for long histories.
+
+    Paper ids and judge models are interned, so every match refers to the
+    same string objects; the winner is an outcome code and the date whole
+    UTC seconds. ``winner`` and ``date`` read back as the strings stored in
+    state files. Build records from those strings with ``create``.
+    """
+
     paper_a: str
     paper_b: str
-    winner: str
-    date: str
+    outcome: int
+    timestamp: int
     judge_model: str
     swapped_consistent: bool
     rationale_short: str
 
+    @property
+    def winner(self) -> str:
+        return WINNERS[self.outcome]
+
+    @property
+    def date(self) -> str:
+        return iso_from_epoch(self.timestamp)
+
     @classmethod
-    def from_dict(cls, payload: dict[str, Any]) -> "MatchRecord":
+    def create(
+        cls,
+        paper_a: str,
+        paper_b: str,
+        winner: str,
+        date: str,
+        judge_model: str,
+        swapped_consistent: bool,
+        rationale_short: str,
+    ) -> "MatchRecord":
         return cls(
+            sys.intern(paper_a),
+            sys.intern(paper_b),
+            WINNER_CODES.get(winner, DRAW),
+            epoch_seconds(date),
+            sys.intern(judge_model),
+            swapped_consistent,
+            rationale_short,
+        )
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> "MatchRecord":
+        date = payload.get("date")
+        return cls.create(
             paper_a=payload.get("paper_a", payload.get("paperA", "")),
             paper_b=payload.get("paper_b", payload.get("paperB", "")),
             winner=payload.get("winner", "tie"),
-            date=payload.get("date", utc_now_iso()),
+            date=date if date is not None else utc_now_iso(),
             judge_model=payload.get(
                 "judge_model", payload.get("judgeModel", "unknown")
             ),
@@ -143,6 +239,13 @@ class MatchRecord:
             ),
         )
 
+    @classmethod
+    def from_state_dict(cls, payload: dict[str, Any]) -> "MatchRecord":
+        """Fast path for rows written by ``to_state_dict``."""
+        if tuple(payload) == _MATCH_STATE_KEYS:
+            return cls.create(*payload.values())
+        return cls.create(**payload)
+
     def to_state_dict(self) -> dict[str, Any]:
         return {
             "paper_a": self.paper_a,
@@ -161,3 +264,15 @@ class MatchRecord:
             "winner": self.winner,
             "date": self.date,
         }
+
+
+_PAPER_FIELDS = tuple(item.name for item in fields(PaperRecord))
+_MATCH_STATE_KEYS = (
+    "paper_a",
+    "paper_b",
+    "winner",
+    "date",
+    "judge_model",
+    "swapped_consistent",
+    "rationale_short",
+)
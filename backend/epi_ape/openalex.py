@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.message import Message
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode
+
+from .resilience import default_resilience
+from .transport import default_pool
+from .utils import dump_json, ensure_dir, load_json, loads_json
+
+DEFAULT_BASE_URL = "https://api.openalex.org"
+# Largest page the works endpoint serves.
+MAX_PER_PAGE = 200
+
+
+def openalex_base_url() -> str:
+    return (os.getenv("OPENALEX_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+
+
+class OpenAlexCache:
+    """OpenAlex responses on disk, one JSON file per request URL.
+
+    Entries younger than ``ttl`` seconds are served without a request. Older
+    ones are revalidated with ``If-None-Match`` / ``If-Modified-Since`` when
+    the server sent an ``ETag`` or ``Last-Modified``, so an unchanged result
+    costs one bodiless 304.
+    """
+
+    def __init__(self, cache_dir: Path, ttl: float = 86400.0) -> None:
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+
+    def _path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, url: str) -> dict[str, Any] | None:
+        try:
+            entry = load_json(self._path(url), default=None)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("url") != url:
+            return None
+        return entry
+
+    def is_fresh(self, entry: dict[str, Any]) -> bool:
+        return time.time() - float(entry.get("fetched_at", 0)) < self.ttl
+
+    def put(self, url: str, payload: Any, headers: Message) -> None:
+        self._write(
+            {
+                "url": url,
+                "fetched_at": time.time(),
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "payload": payload,
+            }
+        )
+
+    def touch(self, entry: dict[str, Any]) -> None:
+        """Mark a revalidated entry fresh again."""
+        self._write({**entry, "fetched_at": time.time()})
+
+    def _write(self, entry: dict[str, Any]) -> None:
+        ensure_dir(self.cache_dir)
+        dump_json(self._path(entry["url"]), entry, keep_backup=False)
+
+    def prune(self, max_age: float) -> int:
+        """Delete entries not fetched or revalidated for ``max_age`` seconds."""
+        if not self.cache_dir.exists():
+            return 0
+        cutoff = time.time() - max_age
+        removed = 0
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+
+@dataclass
+class OpenAlexStats:
+    requests: int = 0
+    cache_hits: int = 0
+    revalidated: int = 0
+
+
+class OpenAlexClient:
+    """Works search against the OpenAlex API, through an optional cache.
+
+    Requests share the keep-alive pool and the retry/breaker policy (key
+    ``openalex``) used for provider calls.
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        cache: OpenAlexCache | None = None,
+        timeout: float = 30.0,
+        max_workers: int = 4,
+    ) -> None:
+        self.base_url = (base_url or openalex_base_url()).rstrip("/")
+        self.cache = cache
+        self.timeout = timeout
+        self.max_workers = max(1, max_workers)
+        self.stats = OpenAlexStats()
+        self._lock = threading.Lock()
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self.stats, field, getattr(self.stats, field) + 1)
+
+    def get(self, path: str, params: dict[str, str]) -> Any:
+        url = f"{self.base_url}{path}?{urlencode(params)}"
+        entry = self.cache.get(url) if self.cache is not None else None
+        if entry is not None and self.cache.is_fresh(entry):
+            self._count("cache_hits")
+            return entry["payload"]
+
+        headers = {"Accept": "application/json"}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = default_resilience().call(
+            "openalex",
+            lambda: default_pool().request(
+                "GET", url, headers=headers, timeout=self.timeout
+            ),
+        )
+        self._count("requests")
+        if response.status == 304 and entry is not None:
+            self.cache.touch(entry)
+            self._count("revalidated")
+            return entry["payload"]
+
+        payload = loads_json(response.body)
+        if self.cache is not None:
+            self.cache.put(url, payload, response.headers)
+        return payload
+
+    def search_works(
+        self, search: str, filter: str, sort: str, limit: int
+    ) -> list[dict[str, Any]]:
+        """Up to ``limit`` works for one query, following ``next_cursor`` pages."""
+        works: list[dict[str, Any]] = []
+        per_page = max(1, min(MAX_PER_PAGE, limit))
+        cursor: str | None = "*"
+        while cursor and len(works) < limit:
+            payload = self.get(
+                "/works",
+                {
+                    "search": search,
+                    "filter": filter,
+                    "sort": sort,
+                    "per-page": str(per_page),
+                    "cursor": cursor,
+                },
+            )
+            results = payload.get("results") or []
+            if not results:
+                break
+            works.extend(results)
+            cursor = (payload.get("meta") or {}).get("next_cursor")
+        return works[:limit]
+
+    def search_many(
+        self, queries: list[str], filter: str, sort: str, limit: int
+    ) -> list[list[dict[str, Any]]]:
+        """Run ``search_works`` for every query at once; results in query order.
+
+        A failed query contributes no works; the first error is raised only
+        when every query failed.
+        """
+        if not queries:
+            return []
+        workers = min(self.max_workers, len(queries))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="epi-ape-openalex"
+        ) as pool:
+            futures = [
+                pool.submit(self.search_works, query, filter, sort, limit)
+                for query in queries
+            ]
+
+        results: list[list[dict[str, Any]]] = []
+        errors: list[BaseException] = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as exc:
+                errors.append(exc)
+                results.append([])
+        if len(errors) == len(queries):
+            raise errors[0]
+        return results
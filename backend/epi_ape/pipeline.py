@@ -1,17 +1,28 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, Iterable
 
+from .batch import BatchRunner
+from .cache import ResponseCache
+from .concurrency import LLMExecutor
 from .config import Settings
 from .discovery import discover_human_benchmarks, propose_ai_ideas
 from .generation import generate_batch
+from .llm import clear_prefetched, set_metrics_recorder, set_response_cache
+from .metrics import MetricsRecorder
 from .models import MatchRecord, PaperRecord, utc_now_iso
+from .openalex import OpenAlexCache, OpenAlexClient
 from .publish import publish_web_data
-from .review import run_advisor_stage, run_reviewer_stage
-from .storage import StateStore
-from .tournament import run_tournament_round
-from .utils import load_json
+from .ratelimit import configure_rate_limits
+from .resilience import configure_resilience
+from .review import run_advisor_stage, run_review_pipeline, run_reviewer_stage
+from .scheduler import make_scheduler
+from .storage import StateStore, open_store
+from .tournament import TournamentProgress, TournamentStats, run_tournament_round
+from .transport import configure_http
+from .utils import load_json, now_compact, set_fsync
 
 
 @dataclass
@@ -23,6 +34,22 @@ class CycleReport:
     advisor_touched: int
     reviewer_touched: int
     new_matches: int
+    llm_cache_hits: int = 0
+    llm_cache_misses: int = 0
+    http_requests: int = 0
+    http_connections: int = 0
+    openalex_requests: int = 0
+    openalex_cache_hits: int = 0
+    openalex_revalidated: int = 0
+    resumed_after: str = ""
+    llm_calls: dict[str, dict[str, Any]] = field(default_factory=dict)
+    llm_fallbacks: dict[str, int] = field(default_factory=dict)
+    llm_circuit_trips: dict[str, int] = field(default_factory=dict)
+    llm_throttled_seconds: dict[str, float] = field(default_factory=dict)
+    batch_submitted: int = 0
+    batch_completed: int = 0
+    batch_errors: list[str] = field(default_factory=list)
+    metrics_path: Path | None = None
 
 
 def _bootstrap_papers_from_web_data(web_data_dir: Path) -> list[PaperRecord]:
@@ -65,16 +92,155 @@ def _normalize_papers(papers: list[PaperRecord]) -> None:
                 paper.status = "idea"
 
 
+def _open_response_cache(settings: Settings) -> ResponseCache | None:
+    if not settings.llm_cache_enabled:
+        return None
+    return ResponseCache(
+        settings.cache_dir / "llm_cache",
+        max_bytes=settings.llm_cache_max_mb * 1024 * 1024,
+        max_age_days=settings.llm_cache_max_age_days,
+    )
+
+
+def _openalex_client(settings: Settings) -> OpenAlexClient:
+    ttl = settings.openalex_cache_ttl_hours * 3600.0
+    cache = OpenAlexCache(settings.cache_dir / "openalex_cache", ttl=ttl)
+    # Entries are revalidated after the TTL; drop ones unused for a week past it.
+    cache.prune(ttl + 7 * 86400)
+    return OpenAlexClient(cache=cache, timeout=settings.http_timeout)
+
+
 def run_cycle(
     settings: Settings,
     generate_count: int,
     match_count: int,
+    resume: bool = False,
+) -> CycleReport:
+    set_fsync(settings.state_fsync)
+    http_pool = configure_http(settings.http_pool_size, settings.http_timeout)
+    limiter = configure_rate_limits(settings.provider_rpm, settings.provider_tpm)
+    resilience = configure_resilience(
+        settings.llm_max_attempts,
+        settings.llm_breaker_threshold,
+        settings.llm_breaker_cooldown,
+    )
+    cache = _open_response_cache(settings)
+    set_response_cache(cache)
+    metrics = MetricsRecorder(
+        settings.cache_dir / "metrics" / f"cycle-{now_compact()}.jsonl"
+    )
+    set_metrics_recorder(metrics)
+    batch = None
+    if settings.llm_batch:
+        batch = BatchRunner(
+            settings.cache_dir / "batches",
+            poll_interval=settings.llm_batch_poll_seconds,
+            max_wait=settings.llm_batch_max_wait,
+        )
+    try:
+        report = _run_cycle(settings, generate_count, match_count, batch, resume)
+    finally:
+        clear_prefetched()
+        set_metrics_recorder(None)
+        set_response_cache(None)
+        http_pool.close()
+
+    report.llm_calls = metrics.summary()
+    if batch is not None:
+        report.batch_submitted = batch.stats.submitted
+        report.batch_completed = batch.stats.completed
+        report.batch_errors = list(batch.stats.errors)
+    report.llm_fallbacks = metrics.fallback_reasons()
+    report.llm_throttled_seconds = {
+        provider: round(seconds, 1)
+        for provider, seconds in sorted(limiter.waited_seconds.items())
+    }
+    report.llm_circuit_trips = {
+        provider: state["trips"]
+        for provider, state in resilience.stats().items()
+        if state["trips"]
+    }
+    if metrics.records:
+        report.metrics_path = metrics.path
+
+    http_stats = http_pool.stats()
+    report.http_requests = http_stats["requests"]
+    report.http_connections = http_stats["connections_opened"]
+
+    if cache is not None:
+        cache.evict()
+        stats = cache.stats()
+        report.llm_cache_hits = stats["hits"]
+        report.llm_cache_misses = stats["misses"]
+    return report
+
+
+def _run_cycle(
+    settings: Settings,
+    generate_count: int,
+    match_count: int,
+    batch: BatchRunner | None = None,
+    resume: bool = False,
 ) -> CycleReport:
-    store = StateStore(settings.state_dir)
+    store = open_store(settings.state_dir, settings.state_backend)
     store.init_dirs()
+    try:
+        return _run_stages(settings, store, generate_count, match_count, batch, resume)
+    finally:
+        store.close()
+
+
+def _rating_snapshot(papers: list[PaperRecord]) -> dict[str, list]:
+    return {
+        paper.id: [paper.mu, paper.sigma, paper.elo, paper.matches_played]
+        for paper in papers
+    }
+
+
+def _restore_ratings(papers: list[PaperRecord], snapshot: dict[str, list]) -> None:
+    for paper in papers:
+        saved = snapshot.get(paper.id)
+        if saved is not None:
+            paper.mu, paper.sigma, paper.elo, paper.matches_played = saved
+
+
+def _run_stages(
+    settings: Settings,
+    store: StateStore,
+    generate_count: int,
+    match_count: int,
+    batch: BatchRunner | None = None,
+    resume: bool = False,
+) -> CycleReport:
+    # Progress is committed after every stage and every few tournament
+    # matches: papers and new matches first, then the cycle checkpoint,
+    # which is what ``resume`` trusts.
+    checkpoint = store.load_cycle_checkpoint() if resume else None
+    resumed_after = ""
+    if checkpoint is None:
+        checkpoint = {
+            "started_at": utc_now_iso(),
+            "generate_count": generate_count,
+            "match_count": match_count,
+            "completed": [],
+        }
+    else:
+        generate_count = int(checkpoint.get("generate_count", generate_count))
+        match_count = int(checkpoint.get("match_count", match_count))
+        resumed_after = (checkpoint["completed"] or ["start"])[-1]
+    completed: list[str] = checkpoint["completed"]
+    tournament_state = checkpoint.get("tournament")
 
     papers = store.load_papers()
     matches = store.load_matches()
+    if (
+        tournament_state is not None
+        and len(matches) > tournament_state["matches_total"]
+    ):
+        # Matches appended after the last commit point will be judged again.
+        matches = matches[: tournament_state["matches_total"]]
+        store.save_matches(matches)
+    persisted_matches = len(matches)
 
     if not papers:
         papers = _bootstrap_papers_from_web_data(settings.web_data_dir)
@@ -85,36 +251,119 @@ def run_cycle(
 
     initial_len = len(papers)
 
-    human_additions = discover_human_benchmarks(papers, target_additions=8)
-    papers.extend(human_additions)
-
-    idea_pool = [
-        paper for paper in papers if paper.source == "ai" and paper.status == "idea"
-    ]
-    need_ideas = max(0, generate_count - len(idea_pool))
-    ai_ideas = propose_ai_ideas(papers, count=need_ideas)
-    papers.extend(ai_ideas)
-
-    generated = generate_batch(settings.papers_dir, papers, max_count=generate_count)
-
-    advisor_touched = run_advisor_stage(
-        settings.root_dir,
-        papers,
-        settings.advisor_models,
-        required_passes=min(3, len(settings.advisor_models)),
-    )
-    reviewer_touched = run_reviewer_stage(
-        settings.root_dir,
-        papers,
-        settings.reviewer_models,
-    )
-
-    matches, tournament_stats = run_tournament_round(
-        papers,
-        matches,
-        judge_model=settings.judge_model,
-        match_count=match_count,
-    )
+    def commit(stage: str) -> None:
+        nonlocal persisted_matches
+        store.save_papers(papers)
+        store.append_matches(matches[persisted_matches:])
+        persisted_matches = len(matches)
+        completed.append(stage)
+        store.save_cycle_checkpoint(checkpoint)
+
+    human_additions: list[PaperRecord] = []
+    ai_ideas: list[PaperRecord] = []
+    openalex = _openalex_client(settings)
+    if "discovery" not in completed:
+        ids = store.id_allocator()
+        ids.seed(papers)
+        titles = store.load_title_index(papers, settings.title_similarity)
+        human_additions = discover_human_benchmarks(
+            papers, target_additions=8, ids=ids, openalex=openalex, titles=titles
+        )
+        papers.extend(human_additions)
+
+        idea_pool = store.select_papers(papers, "ai", ("idea",))
+        need_ideas = max(0, generate_count - len(idea_pool))
+        ai_ideas = propose_ai_ideas(papers, count=need_ideas, ids=ids, titles=titles)
+        papers.extend(ai_ideas)
+        store.save_title_index(titles)
+        commit("discovery")
+
+    generated: list[PaperRecord] = []
+    if "generation" not in completed:
+        generated = generate_batch(
+            settings.papers_dir,
+            store.select_papers(papers, "ai", ("idea",)),
+            max_count=generate_count,
+            workers=settings.generation_workers,
+        )
+        commit("generation")
+
+    advisor_touched: list[PaperRecord] = []
+    reviewer_touched: list[PaperRecord] = []
+    tournament_stats = TournamentStats(0, 0, 0, 0)
+    with LLMExecutor(settings.llm_concurrency, settings.provider_concurrency) as pool:
+        if "review" not in completed:
+            advisor_queue = store.select_papers(
+                papers, "ai", ("draft", "advisor_failed")
+            )
+            required_passes = min(3, len(settings.advisor_models))
+            if settings.pipelined and pool.concurrent and batch is None:
+                advisor_touched, reviewer_touched = run_review_pipeline(
+                    settings.root_dir,
+                    advisor_queue,
+                    store.select_papers(papers, "ai", ("advisor_passed",)),
+                    settings.advisor_models,
+                    settings.reviewer_models,
+                    required_passes=required_passes,
+                    executor=pool,
+                    workers=settings.llm_concurrency,
+                    queue_size=settings.pipeline_queue_size,
+                )
+            else:
+                advisor_touched = run_advisor_stage(
+                    settings.root_dir,
+                    advisor_queue,
+                    settings.advisor_models,
+                    required_passes=required_passes,
+                    executor=pool,
+                    batch=batch,
+                )
+                reviewer_touched = run_reviewer_stage(
+                    settings.root_dir,
+                    store.select_papers(papers, "ai", ("advisor_passed",)),
+                    settings.reviewer_models,
+                    executor=pool,
+                    batch=batch,
+                )
+            commit("review")
+
+        if "tournament" not in completed:
+            pool_papers = store.select_papers(
+                papers, "human", ("peer_reviewed",)
+            ) + store.select_papers(papers, "ai", ("reviewed",))
+            progress = None
+            if tournament_state is not None:
+                progress = TournamentProgress.from_dict(tournament_state)
+                _restore_ratings(pool_papers, tournament_state.get("ratings", {}))
+            round_base = matches
+
+            def tournament_checkpoint(
+                progress: TournamentProgress, played: list[MatchRecord]
+            ) -> None:
+                nonlocal persisted_matches
+                store.append_matches(played[persisted_matches - len(round_base) :])
+                persisted_matches = len(round_base) + len(played)
+                store.save_papers(papers)
+                checkpoint["tournament"] = {
+                    **progress.to_dict(),
+                    "matches_total": persisted_matches,
+                    "ratings": _rating_snapshot(pool_papers),
+                }
+                store.save_cycle_checkpoint(checkpoint)
+
+            matches, tournament_stats = run_tournament_round(
+                pool_papers,
+                matches,
+                judge_model=settings.judge_model,
+                match_count=match_count,
+                executor=pool,
+                scheduler=make_scheduler(
+                    settings.match_scheduler, settings.target_sigma
+                ),
+                progress=progress,
+                on_checkpoint=tournament_checkpoint,
+                checkpoint_every=settings.checkpoint_every_matches,
+            )
 
     by_id = _index_by_id(papers)
     for match in matches[-tournament_stats.matches_created :]:
@@ -124,7 +373,8 @@ def run_cycle(
             by_id[match.paper_b].updated_at = utc_now_iso()
 
     store.save_papers(papers)
-    store.save_matches(matches)
+    store.append_matches(matches[persisted_matches:])
+    store.clear_cycle_checkpoint()
     store.save_meta(
         {
             "last_cycle_at": utc_now_iso(),
@@ -147,19 +397,27 @@ def run_cycle(
         advisor_touched=len(advisor_touched),
         reviewer_touched=len(reviewer_touched),
         new_matches=tournament_stats.matches_created,
+        openalex_requests=openalex.stats.requests,
+        openalex_cache_hits=openalex.stats.cache_hits,
+        openalex_revalidated=openalex.stats.revalidated,
+        resumed_after=resumed_after,
     )
 
 
 def publish_only(settings: Settings) -> None:
-    store = StateStore(settings.state_dir)
-    papers = store.load_papers()
-    matches = store.load_matches()
-
-    if not papers:
-        papers = _bootstrap_papers_from_web_data(settings.web_data_dir)
-    if not matches:
-        matches = _bootstrap_matches_from_web_data(settings.web_data_dir)
-
-    _normalize_papers(papers)
-
-    publish_web_data(settings.web_data_dir, papers, matches)
+    set_fsync(settings.state_fsync)
+    store = open_store(settings.state_dir, settings.state_backend)
+    try:
+        papers = store.load_papers()
+        if not papers:
+            papers = _bootstrap_papers_from_web_data(settings.web_data_dir)
+        _normalize_papers(papers)
+
+        # The match history is streamed; only the newest matches are kept.
+        if store.has_matches():
+            matches: Iterable[MatchRecord] = store.iter_matches()
+        else:
+            matches = _bootstrap_matches_from_web_data(settings.web_data_dir)
+        publish_web_data(settings.web_data_dir, papers, matches)
+    finally:
+        store.close()
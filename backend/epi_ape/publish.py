@@ -1,46 +1,50 @@
 from __future__ import annotations
 
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Iterable
 
 from .models import MatchRecord, PaperRecord
 from .utils import dump_json, ensure_dir
 
 
-def _counts(matches: list[MatchRecord]) -> dict:
-    ai_wins = 0
-    human_wins = 0
-    ties = 0
+def publish_web_data(
+    web_data_dir: Path,
+    papers: Iterable[PaperRecord],
+    matches: Iterable[MatchRecord],
+    recent_count: int = 20,
+) -> None:
+    """Write the site's data files in one pass over ``papers`` and ``matches``.
+
+    Both may be iterators streamed off disk: only the web view of each paper
+    and the newest ``recent_count`` matches are kept.
+    """
+    ensure_dir(web_data_dir)
+
+    scored = [(paper.conservative_score(), paper.to_web_dict()) for paper in papers]
+    scored.sort(key=lambda item: item[0], reverse=True)
+    papers_payload = [item for _, item in scored]
+    dump_json(web_data_dir / "papers.json", papers_payload, pretty=True)
 
+    counts = {"aiWins": 0, "humanWins": 0, "ties": 0}
+    recent: deque[MatchRecord] = deque(maxlen=recent_count)
+    total = 0
     for match in matches:
+        total += 1
         if match.winner == "paperA":
-            ai_wins += 1
+            counts["aiWins"] += 1
         elif match.winner == "paperB":
-            human_wins += 1
+            counts["humanWins"] += 1
         else:
-            ties += 1
-
-    return {"aiWins": ai_wins, "humanWins": human_wins, "ties": ties}
-
-
-def publish_web_data(
-    web_data_dir: Path, papers: list[PaperRecord], matches: list[MatchRecord]
-) -> None:
-    ensure_dir(web_data_dir)
-
-    papers_payload = [
-        paper.to_web_dict()
-        for paper in sorted(papers, key=lambda x: x.conservative_score(), reverse=True)
-    ]
-    dump_json(web_data_dir / "papers.json", papers_payload)
+            counts["ties"] += 1
+        recent.append(match)
 
-    counts = _counts(matches)
-    recent = list(reversed(matches[-20:]))
     matches_payload = {
         "lastUpdated": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
-        "totalMatches": len(matches),
+        "totalMatches": total,
         "dailyMatches": 50,
         "aiVsHuman": counts,
-        "recentMatches": [item.to_web_dict() for item in recent],
+        "recentMatches": [item.to_web_dict() for item in reversed(recent)],
     }
-    dump_json(web_data_dir / "matches.json", matches_payload)
+    dump_json(web_data_dir / "matches.json", matches_payload, pretty=True)
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """Refills at ``per_minute / 60`` units a second, holding up to a minute's worth.
+
+    ``acquire`` reserves its units immediately, letting the level go negative,
+    and then sleeps until the debt it created has been refilled. Callers are
+    therefore served in arrival order, and a burst of small calls cannot
+    starve a large one.
+    """
+
+    def __init__(
+        self,
+        per_minute: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` units and return how long the caller must wait."""
+        with self._lock:
+            self._refill()
+            # A request larger than the whole bucket would never fit.
+            self.level -= min(amount, self.capacity)
+            return max(0.0, -self.level / self.rate)
+
+    def acquire(self, amount: float = 1.0) -> float:
+        wait = self.reserve(amount)
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def refund(self, amount: float) -> None:
+        """Return (or, if negative, additionally charge) ``amount`` units."""
+        with self._lock:
+            self._refill()
+            self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    """Per-provider requests-per-minute and tokens-per-minute budgets.
+
+    Providers without a configured budget are not limited. Token cost is not
+    known before a call, so callers reserve an estimate and ``settle`` it
+    against the usage the provider reports.
+    """
+
+    def __init__(
+        self,
+        rpm: dict[str, int] | None = None,
+        tpm: dict[str, int] | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.sleep = sleep
+        self._requests = {
+            provider: TokenBucket(limit)
+            for provider, limit in (rpm or {}).items()
+            if limit > 0
+        }
+        self._tokens = {
+            provider: TokenBucket(limit)
+            for provider, limit in (tpm or {}).items()
+            if limit > 0
+        }
+        self._lock = threading.Lock()
+        self.waited_seconds: dict[str, float] = {}
+
+    def acquire(self, provider: str, tokens: int) -> float:
+        """Block until ``provider`` has room for one request of ``tokens``."""
+        wait = 0.0
+        requests = self._requests.get(provider)
+        if requests is not None:
+            wait = requests.reserve(1)
+        budget = self._tokens.get(provider)
+        if budget is not None:
+            wait = max(wait, budget.reserve(tokens))
+        if wait > 0:
+            with self._lock:
+                self.waited_seconds[provider] = (
+                    self.waited_seconds.get(provider, 0.0) + wait
+                )
+            self.sleep(wait)
+        return wait
+
+    def settle(self, provider: str, estimated: int, actual: int) -> None:
+        budget = self._tokens.get(provider)
+        if budget is not None:
+            budget.refund(estimated - actual)
+
+
+_default_limiter = RateLimiter()
+
+
+def default_limiter() -> RateLimiter:
+    return _default_limiter
+
+
+def configure_rate_limits(rpm: dict[str, int], tpm: dict[str, int]) -> RateLimiter:
+    """Replace the shared limiter used by every provider call and return it."""
+    global _default_limiter
+    _default_limiter = RateLimiter(rpm=rpm, tpm=tpm)
+    return _default_limiter
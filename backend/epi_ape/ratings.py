@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import math
+from statistics import NormalDist
+from types import SimpleNamespace
+from typing import Iterable, Sequence
+
+from .matchtable import MatchTable
+from .models import A_WINS, B_WINS, DRAW, WINNERS, MatchRecord, PaperRecord
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+try:
+    import trueskill as ts
+except Exception:
+    ts = None
+
+# Defaults of the trueskill package's global environment, which
+# tournament._update_rating_trueskill relies on via ts.rate_1vs1.
+TS_MU = 25.0
+TS_SIGMA = TS_MU / 3
+TS_BETA = TS_SIGMA / 2
+TS_TAU = TS_SIGMA / 100
+TS_DRAW_PROBABILITY = 0.10
+TS_DRAW_MARGIN = (
+    NormalDist().inv_cdf((TS_DRAW_PROBABILITY + 1) / 2) * math.sqrt(2) * TS_BETA
+)
+
+# Chebyshev coefficients of trueskill.backends.erfc, innermost first.
+_ERFC_COEFFS = (
+    0.17087277,
+    -0.82215223,
+    1.48851587,
+    -1.13520398,
+    0.27886807,
+    -0.18628806,
+    0.09678418,
+    0.37409196,
+    1.00002368,
+)
+
+
+def _erfc(x):
+    # Same approximation and evaluation order as trueskill's erfc, vectorized.
+    z = np.abs(x)
+    t = 1.0 / (1.0 + z / 2.0)
+    poly = _ERFC_COEFFS[0]
+    for coeff in _ERFC_COEFFS[1:]:
+        poly = coeff + t * poly
+    r = t * np.exp(-z * z - 1.26551223 + t * poly)
+    return np.where(x < 0, 2.0 - r, r)
+
+
+def _cdf(x):
+    return 0.5 * _erfc(-x / math.sqrt(2))
+
+
+def _pdf(x):
+    return np.exp(-(x**2) / 2) / math.sqrt(2 * math.pi)
+
+
+def _schedule_waves(a_idx: Sequence[int], b_idx: Sequence[int]) -> list[list[int]]:
+    """Split matches into ordered waves in which no paper appears twice.
+
+    Applying waves one after another, each as a single vector update, gives
+    the same result as applying the matches sequentially.
+    """
+    last_wave: dict[int, int] = {}
+    waves: list[list[int]] = []
+    for pos, (a, b) in enumerate(zip(a_idx, b_idx)):
+        wave = max(last_wave.get(a, -1), last_wave.get(b, -1)) + 1
+        if wave == len(waves):
+            waves.append([])
+        waves[wave].append(pos)
+        last_wave[a] = wave
+        last_wave[b] = wave
+    return waves
+
+
+class RatingTable:
+    """mu / sigma / elo for a set of papers, held in arrays indexed by paper.
+
+    ``method="trueskill"`` reproduces ``trueskill.rate_1vs1`` under the
+    package's default environment (within 1e-6 on mu and sigma over long
+    chains of matches; elo can differ by one point when mu sits on a boundary);
+    ``method="elo"`` reproduces ``tournament._update_rating_elo``. Both match
+    the per-match updates used by ``run_tournament_round``.
+    """
+
+    def __init__(
+        self,
+        ids: list[str],
+        mu: Sequence[float],
+        sigma: Sequence[float],
+        elo: Sequence[int],
+        method: str | None = None,
+    ) -> None:
+        self.ids = list(ids)
+        self.index = {paper_id: pos for pos, paper_id in enumerate(self.ids)}
+        self.method = method or ("trueskill" if ts is not None else "elo")
+        self.played = [0] * len(self.ids)
+        if np is not None:
+            self.mu = np.asarray(mu, dtype=np.float64).copy()
+            self.sigma = np.asarray(sigma, dtype=np.float64).copy()
+            self.elo = np.asarray(elo, dtype=np.int64).copy()
+            self.played = np.zeros(len(self.ids), dtype=np.int64)
+        else:
+            self.mu = [float(value) for value in mu]
+            self.sigma = [float(value) for value in sigma]
+            self.elo = [int(value) for value in elo]
+
+    @classmethod
+    def from_papers(
+        cls, papers: Iterable[PaperRecord], method: str | None = None
+    ) -> "RatingTable":
+        papers = list(papers)
+        return cls(
+            [paper.id for paper in papers],
+            [paper.mu for paper in papers],
+            [paper.sigma for paper in papers],
+            [paper.elo for paper in papers],
+            method=method,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def apply(
+        self, a_idx: Sequence[int], b_idx: Sequence[int], outcomes: Sequence[int]
+    ) -> None:
+        """Apply 1v1 results in order; ``outcomes`` uses A_WINS/DRAW/B_WINS."""
+        if np is None:
+            self._apply_scalar(a_idx, b_idx, outcomes)
+            return
+
+        a_all = np.asarray(a_idx, dtype=np.int64)
+        b_all = np.asarray(b_idx, dtype=np.int64)
+        out_all = np.asarray(outcomes, dtype=np.int64)
+        update = self._wave_trueskill if self.method == "trueskill" else self._wave_elo
+
+        for wave in _schedule_waves(a_all.tolist(), b_all.tolist()):
+            sel = np.asarray(wave, dtype=np.int64)
+            update(a_all[sel], b_all[sel], out_all[sel])
+
+        np.add.at(self.played, a_all, 1)
+        np.add.at(self.played, b_all, 1)
+
+    def apply_matches(self, matches: Iterable[MatchRecord]) -> int:
+        """Apply matches whose papers are both in the table; return the count."""
+        a_idx: list[int] = []
+        b_idx: list[int] = []
+        outcomes: list[int] = []
+        for match in matches:
+            a = self.index.get(match.paper_a)
+            b = self.index.get(match.paper_b)
+            if a is None or b is None:
+                continue
+            a_idx.append(a)
+            b_idx.append(b)
+            outcomes.append(match.outcome)
+        self.apply(a_idx, b_idx, outcomes)
+        return len(a_idx)
+
+    def apply_match_table(self, table: MatchTable) -> int:
+        """Like ``apply_matches``, reading a ``MatchTable``'s columns."""
+        lookup = [self.index.get(paper_id, -1) for paper_id in table.ids]
+        a_idx: list[int] = []
+        b_idx: list[int] = []
+        outcomes: list[int] = []
+        for a, b, outcome in zip(table.paper_a, table.paper_b, table.outcome):
+            a = lookup[a]
+            b = lookup[b]
+            if a < 0 or b < 0:
+                continue
+            a_idx.append(a)
+            b_idx.append(b)
+            outcomes.append(outcome)
+        self.apply(a_idx, b_idx, outcomes)
+        return len(a_idx)
+
+    def _wave_trueskill(self, a, b, outcome) -> None:
+        swap = outcome == B_WINS
+        win = np.where(swap, b, a)
+        lose = np.where(swap, a, b)
+        draw = outcome == DRAW
+
+        var_w = self.sigma[win] ** 2 + TS_TAU**2
+        var_l = self.sigma[lose] ** 2 + TS_TAU**2
+        c = np.sqrt(2 * TS_BETA**2 + var_w + var_l)
+        t = (self.mu[win] - self.mu[lose]) / c
+        eps = TS_DRAW_MARGIN / c
+
+        # Decisive results.
+        x = t - eps
+        denom = _cdf(x)
+        v_win = np.where(denom > 0, _pdf(x) / np.where(denom > 0, denom, 1.0), -x)
+        w_win = v_win * (v_win + x)
+
+        # Draws.
+        abs_t = np.abs(t)
+        hi = eps - abs_t
+        lo = -eps - abs_t
+        d_denom = _cdf(hi) - _cdf(lo)
+        safe = np.where(d_denom > 0, d_denom, 1.0)
+        v_abs = np.where(d_denom > 0, (_pdf(lo) - _pdf(hi)) / safe, hi)
+        v_draw = np.where(t < 0, -v_abs, v_abs)
+        w_draw = v_abs**2 + (hi * _pdf(hi) - lo * _pdf(lo)) / safe
+
+        v = np.where(draw, v_draw, v_win)
+        w = np.where(draw, w_draw, w_win)
+
+        self.mu[win] = self.mu[win] + var_w / c * v
+        self.mu[lose] = self.mu[lose] - var_l / c * v
+        self.sigma[win] = np.sqrt(var_w * (1 - var_w / c**2 * w))
+        self.sigma[lose] = np.sqrt(var_l * (1 - var_l / c**2 * w))
+        self.elo[a] = np.trunc(1500 + (self.mu[a] - 25.0) * 38).astype(np.int64)
+        self.elo[b] = np.trunc(1500 + (self.mu[b] - 25.0) * 38).astype(np.int64)
+
+    def _wave_elo(self, a, b, outcome, k: float = 24.0) -> None:
+        ea = 1.0 / (1.0 + 10 ** ((self.elo[b] - self.elo[a]) / 400.0))
+        sa = np.where(outcome == A_WINS, 1.0, np.where(outcome == B_WINS, 0.0, 0.5))
+
+        self.elo[a] = np.round(self.elo[a] + k * (sa - ea)).astype(np.int64)
+        self.elo[b] = np.round(self.elo[b] + k * ((1.0 - sa) - (1.0 - ea))).astype(
+            np.int64
+        )
+        self.mu[a] = 25.0 + (self.elo[a] - 1500) / 38.0
+        self.mu[b] = 25.0 + (self.elo[b] - 1500) / 38.0
+        self.sigma[a] = np.maximum(0.9, self.sigma[a] * 0.995)
+        self.sigma[b] = np.maximum(0.9, self.sigma[b] * 0.995)
+
+    def _apply_scalar(self, a_idx, b_idx, outcomes) -> None:
+        # Without numpy, replay through the tournament's own update functions.
+        from .tournament import _update_rating_elo, _update_rating_trueskill
+
+        update = (
+            _update_rating_trueskill
+            if self.method == "trueskill"
+            else _update_rating_elo
+        )
+        for a, b, outcome in zip(a_idx, b_idx, outcomes):
+            pa = SimpleNamespace(mu=self.mu[a], sigma=self.sigma[a], elo=self.elo[a])
+            pb = SimpleNamespace(mu=self.mu[b], sigma=self.sigma[b], elo=self.elo[b])
+            winner = WINNERS.get(outcome, "tie")
+            update(pa, pb, winner)
+            for pos, rated in ((a, pa), (b, pb)):
+                self.mu[pos] = rated.mu
+                self.sigma[pos] = rated.sigma
+                self.elo[pos] = rated.elo
+                self.played[pos] += 1
+
+    def snapshot(self) -> dict[str, list]:
+        return {
+            "ids": list(self.ids),
+            "mu": [float(value) for value in self.mu],
+            "sigma": [float(value) for value in self.sigma],
+            "elo": [int(value) for value in self.elo],
+            "played": [int(value) for value in self.played],
+        }
+
+    def restore(self, state: dict[str, list]) -> int:
+        """Overwrite ratings for ids present in ``state``; return how many."""
+        restored = 0
+        for offset, paper_id in enumerate(state.get("ids", [])):
+            pos = self.index.get(paper_id)
+            if pos is None:
+                continue
+            self.mu[pos] = float(state["mu"][offset])
+            self.sigma[pos] = float(state["sigma"][offset])
+            self.elo[pos] = int(state["elo"][offset])
+            self.played[pos] = int(state["played"][offset])
+            restored += 1
+        return restored
+
+    def write_back(self, papers: Iterable[PaperRecord]) -> None:
+        for paper in papers:
+            pos = self.index.get(paper.id)
+            if pos is None:
+                continue
+            paper.mu = float(self.mu[pos])
+            paper.sigma = float(self.sigma[pos])
+            paper.elo = int(self.elo[pos])
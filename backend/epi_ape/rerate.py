@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import hashlib
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from .config import Settings
+from .discovery import benchmark_priors
+from .models import MatchRecord, PaperRecord, utc_now_iso
+from .pipeline import publish_only
+from .ratings import RatingTable
+from .storage import open_store
+from .utils import dump_json, ensure_dir, load_json, set_fsync
+
+AI_PRIOR = (25.0, 8.333, 1500)
+
+
+@dataclass
+class RerateReport:
+    papers: int
+    matches_total: int
+    matches_applied: int
+    matches_skipped: int
+    resumed_from: int
+    checkpoints_written: int
+    method: str
+    # Ratings are only written back when ``written`` is set; a history
+    # missing matches a paper has played stops the rerate unless forced.
+    written: bool = True
+    # (paper id, stored matches_played, matches found in the history)
+    incomplete: list[tuple[str, int, int]] = field(default_factory=list)
+    # Benchmark papers given a guessed prior on this run.
+    anchored: list[str] = field(default_factory=list)
+
+
+def _anchor_priors(papers: list[PaperRecord]) -> list[str]:
+    # Benchmark papers created before priors were recorded get the seeded
+    # prior discovery would have given them, in id order. That is a guess:
+    # their current rating already includes their matches, so starting a
+    # replay from it would count every match twice. The prior is stored on
+    # the paper, so later replays start from the same point.
+    legacy = sorted(
+        (paper for paper in papers if paper.source != "ai" and paper.prior_mu is None),
+        key=lambda paper: paper.id,
+    )
+    for paper, prior in zip(legacy, benchmark_priors()):
+        paper.prior_mu, paper.prior_sigma, paper.prior_elo = prior
+    return [paper.id for paper in legacy]
+
+
+def _incomplete_history(
+    papers: list[PaperRecord], matches: Iterable[MatchRecord]
+) -> list[tuple[str, int, int]]:
+    """Papers whose stored ``matches_played`` exceeds their matches on record."""
+    counts: Counter[str] = Counter()
+    for match in matches:
+        counts[match.paper_a] += 1
+        counts[match.paper_b] += 1
+    return [
+        (paper.id, paper.matches_played, counts[paper.id])
+        for paper in papers
+        if paper.matches_played > counts[paper.id]
+    ]
+
+
+def _prior(paper: PaperRecord) -> tuple[float, float, int]:
+    if paper.prior_mu is None or paper.prior_sigma is None:
+        return AI_PRIOR
+    elo = paper.prior_elo
+    if elo is None:
+        elo = int(1500 + (paper.prior_mu - 25.0) * 38)
+    return paper.prior_mu, paper.prior_sigma, elo
+
+
+def _priors_digest(papers: list[PaperRecord], priors: list[tuple]) -> str:
+    digest = hashlib.sha256()
+    for paper, (mu, sigma, elo) in zip(papers, priors):
+        digest.update(f"{paper.id}|{mu!r}|{sigma!r}|{elo}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _digest_line(match: MatchRecord) -> bytes:
+    return (
+        f"{match.paper_a}|{match.paper_b}|{match.winner}|"
+        f"{match.judge_model}|{match.date}\n"
+    ).encode("utf-8")
+
+
+class CheckpointStore:
+    """Rating snapshots taken every N replayed matches, newest kept last."""
+
+    def __init__(self, directory: Path, keep: int = 3) -> None:
+        self.directory = directory
+        self.keep = keep
+
+    def _paths(self) -> list[Path]:
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob("checkpoint-*.json"))
+
+    def candidates(self, config: dict) -> list[dict]:
+        found = []
+        for path in reversed(self._paths()):
+            payload = load_json(path, default={})
+            if payload.get("config") == config:
+                found.append(payload)
+        return found
+
+    def write(
+        self, position: int, digest: str, config: dict, table: RatingTable
+    ) -> None:
+        ensure_dir(self.directory)
+        dump_json(
+            self.directory / f"checkpoint-{position:010d}.json",
+            {
+                "position": position,
+                "digest": digest,
+                "config": config,
+                "created_at": utc_now_iso(),
+                "ratings": table.snapshot(),
+            },
+        )
+        for stale in self._paths()[: -self.keep]:
+            stale.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        for path in self._paths():
+            path.unlink(missing_ok=True)
+
+
+def _resume_point(
+    checkpoints: CheckpointStore,
+    config: dict,
+    matches: Callable[[], Iterable[MatchRecord]],
+) -> tuple[dict | None, Any]:
+    """Find the newest checkpoint whose match prefix is unchanged."""
+    candidates = checkpoints.candidates(config)
+    if not candidates:
+        return None, hashlib.sha256()
+
+    wanted = {int(candidate.get("position", 0)) for candidate in candidates}
+    last = max(wanted)
+    digest = hashlib.sha256()
+    prefixes = {0: digest.copy()}
+    position = 0
+    for match in matches():
+        if position >= last:
+            break
+        digest.update(_digest_line(match))
+        position += 1
+        if position in wanted:
+            prefixes[position] = digest.copy()
+
+    for candidate in candidates:
+        prefix = prefixes.get(int(candidate.get("position", 0)))
+        if prefix is not None and prefix.hexdigest() == candidate.get("digest"):
+            return candidate, prefix
+    return None, hashlib.sha256()
+
+
+def rerate_history(
+    papers: list[PaperRecord],
+    matches: Callable[[], Iterable[MatchRecord]],
+    checkpoints: CheckpointStore,
+    checkpoint_every: int = 10000,
+    exclude_judges: tuple[str, ...] = (),
+    method: str | None = None,
+    from_scratch: bool = False,
+    force: bool = False,
+) -> RerateReport:
+    """Rebuild mu / sigma / elo / matches_played of ``papers`` from ``matches``.
+
+    ``matches`` returns a fresh pass over the history, oldest first (e.g.
+    ``StateStore.iter_matches``). It is streamed ``checkpoint_every`` matches
+    at a time: once to check that no paper has played more matches than the
+    history holds, then for the replay, plus once more when a checkpoint may
+    be resumed. If the history is incomplete, ``papers`` are left untouched
+    and the report lists the gaps, unless ``force`` is set.
+    """
+    incomplete = _incomplete_history(papers, matches())
+    if incomplete and not force:
+        return RerateReport(
+            papers=len(papers),
+            matches_total=0,
+            matches_applied=0,
+            matches_skipped=0,
+            resumed_from=0,
+            checkpoints_written=0,
+            method=method or "",
+            written=False,
+            incomplete=incomplete,
+        )
+
+    anchored = _anchor_priors(papers)
+    priors = [_prior(paper) for paper in papers]
+    table = RatingTable(
+        [paper.id for paper in papers],
+        [prior[0] for prior in priors],
+        [prior[1] for prior in priors],
+        [prior[2] for prior in priors],
+        method=method,
+    )
+    # A changed prior changes every rating after it, so it invalidates
+    # checkpoints just like a different method or judge filter.
+    config = {
+        "method": table.method,
+        "exclude_judges": sorted(exclude_judges),
+        "priors": _priors_digest(papers, priors),
+    }
+    excluded = set(exclude_judges)
+    checkpoint_every = max(1, checkpoint_every)
+
+    if from_scratch:
+        checkpoints.clear()
+        resume, digest = None, hashlib.sha256()
+    else:
+        resume, digest = _resume_point(checkpoints, config, matches)
+
+    position = 0
+    if resume is not None:
+        table.restore(resume["ratings"])
+        position = int(resume["position"])
+    resumed_from = position
+
+    stream = islice(matches(), position, None)
+    applied = 0
+    considered = 0
+    written = 0
+    while True:
+        chunk = list(islice(stream, checkpoint_every))
+        if not chunk:
+            break
+        included = [match for match in chunk if match.judge_model not in excluded]
+        considered += len(included)
+        applied += table.apply_matches(included)
+        for match in chunk:
+            digest.update(_digest_line(match))
+        position += len(chunk)
+
+        # Only full chunks are checkpointed, so resumed runs stay aligned.
+        if len(chunk) == checkpoint_every:
+            checkpoints.write(position, digest.hexdigest(), config, table)
+            written += 1
+
+    before = {paper.id: (paper.mu, paper.sigma, paper.elo) for paper in papers}
+    table.write_back(papers)
+    now = utc_now_iso()
+    for paper in papers:
+        played = int(table.played[table.index[paper.id]])
+        if (
+            played != paper.matches_played
+            or (paper.mu, paper.sigma, paper.elo) != before[paper.id]
+        ):
+            paper.matches_played = played
+            paper.updated_at = now
+
+    return RerateReport(
+        papers=len(papers),
+        matches_total=position,
+        matches_applied=applied,
+        matches_skipped=considered - applied,
+        resumed_from=resumed_from,
+        checkpoints_written=written,
+        method=table.method,
+        incomplete=incomplete,
+        anchored=anchored,
+    )
+
+
+def run_rerate(
+    settings: Settings,
+    checkpoint_every: int = 10000,
+    exclude_judges: tuple[str, ...] = (),
+    method: str | None = None,
+    from_scratch: bool = False,
+    publish: bool = True,
+    force: bool = False,
+) -> RerateReport:
+    set_fsync(settings.state_fsync)
+    store = open_store(settings.state_dir, settings.state_backend)
+    try:
+        papers = store.load_papers()
+        report = rerate_history(
+            papers,
+            store.iter_matches,
+            CheckpointStore(settings.cache_dir / "rerate"),
+            checkpoint_every=checkpoint_every,
+            exclude_judges=exclude_judges,
+            method=method,
+            from_scratch=from_scratch,
+            force=force,
+        )
+        if report.written:
+            store.save_papers(papers)
+    finally:
+        store.close()
+
+    if publish and report.written:
+        publish_only(settings)
+    return report
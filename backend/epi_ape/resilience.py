@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import http.client
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, TypeVar
+from urllib.error import HTTPError
+
+T = TypeVar("T")
+
+# Statuses worth another attempt: throttling, timeouts and gateway trouble.
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose breaker is open."""
+
+    def __init__(self, key: str, retry_in: float) -> None:
+        super().__init__(f"circuit open for {key}, retry in {retry_in:.0f}s")
+        self.key = key
+        self.retry_in = retry_in
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, HTTPError):
+        return exc.code in RETRY_STATUSES
+    # URLError, timeouts, resets and refused connections are all OSErrors.
+    return isinstance(exc, (OSError, http.client.HTTPException))
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Seconds requested by a ``Retry-After`` header, if the error carries one."""
+    headers = getattr(exc, "headers", None)
+    if headers is None:
+        return None
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one provider.
+
+    After ``failure_threshold`` consecutive failed calls the breaker opens and
+    every call fails fast for ``cooldown`` seconds. Then a single probe call
+    is let through: success closes the breaker, failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        cooldown: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.trips = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probing or self.clock() - self._opened_at >= self.cooldown:
+                return "half_open"
+            return "open"
+
+    def retry_in(self) -> float:
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.cooldown - (self.clock() - self._opened_at))
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or self.clock() - self._opened_at < self.cooldown:
+                return False
+            self._probing = True
+            return True
+
+    def end_probe(self) -> None:
+        """Let the next call probe again if this one ended without an outcome.
+
+        Covers a probe interrupted by a ``BaseException`` such as
+        ``KeyboardInterrupt``, which neither records a success nor a failure.
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._probing or (
+                self._opened_at is None and self.failures >= self.failure_threshold
+            ):
+                if not self._probing:
+                    self.trips += 1
+                self._opened_at = self.clock()
+                self._probing = False
+
+
+class Resilience:
+    """Retries with jittered exponential backoff behind per-key breakers.
+
+    Transient failures (see ``is_transient``) are retried up to
+    ``max_attempts`` times in total. The wait before attempt ``n`` is drawn
+    uniformly from ``[0, min(max_delay, base_delay * 2**n)]`` ("full
+    jitter"), unless the server sent ``Retry-After``, which is honoured when
+    it is no longer than ``max_delay``; a longer request ends the call.
+    Calls that still fail count against the key's breaker. Permanent errors
+    such as 400 or 401 are raised immediately; they show the provider is
+    reachable, so they count as a success for the breaker.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        failure_threshold: int = 5,
+        cooldown: float = 60.0,
+        sleep: Callable[[float], None] = time.sleep,
+        rnd: random.Random | None = None,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.sleep = sleep
+        self._rnd = rnd or random.Random()
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, key: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.cooldown)
+                self._breakers[key] = breaker
+            return breaker
+
+    def backoff(self, attempt: int, exc: BaseException) -> float | None:
+        """Seconds to wait before retry number ``attempt`` (1-based), or None."""
+        requested = retry_after_seconds(exc)
+        if requested is not None:
+            if requested > self.max_delay:
+                return None
+            with self._lock:
+                return requested + self._rnd.uniform(0, self.base_delay)
+        ceiling = min(self.max_delay, self.base_delay * 2**attempt)
+        with self._lock:
+            return self._rnd.uniform(0, ceiling)
+
+    def call(
+        self,
+        key: str,
+        fn: Callable[[], T],
+        on_retry: Callable[[BaseException, float], None] | None = None,
+    ) -> T:
+        breaker = self.breaker(key)
+        if not breaker.allow():
+            raise CircuitOpenError(key, breaker.retry_in())
+
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                try:
+                    result = fn()
+                except Exception as exc:
+                    if not is_transient(exc):
+                        breaker.record_success()
+                        raise
+                    delay = self.backoff(attempt, exc)
+                    if attempt >= self.max_attempts or delay is None:
+                        breaker.record_failure()
+                        raise
+                    if on_retry is not None:
+                        on_retry(exc, delay)
+                    self.sleep(delay)
+                    continue
+                breaker.record_success()
+                return result
+        finally:
+            breaker.end_probe()
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {
+            key: {"state": breaker.state, "trips": breaker.trips}
+            for key, breaker in sorted(breakers.items())
+        }
+
+
+_default_resilience = Resilience()
+
+
+def default_resilience() -> Resilience:
+    return _default_resilience
+
+
+def configure_resilience(
+    max_attempts: int, failure_threshold: int, cooldown: float
+) -> Resilience:
+    """Replace the shared retry/breaker policy (fresh breakers) and return it."""
+    global _default_resilience
+    _default_resilience = Resilience(
+        max_attempts=max_attempts,
+        failure_threshold=failure_threshold,
+        cooldown=cooldown,
+    )
+    return _default_resilience
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from queue import Queue
 
-from .llm import advisor_evaluate, reviewer_evaluate
+from .batch import BatchRunner
+from .concurrency import LLMExecutor
+from .llm import advisor_evaluate, advisor_prompts, reviewer_evaluate, reviewer_prompts
 from .models import PaperRecord, utc_now_iso
 from .utils import seeded_random
 
@@ -82,14 +87,8 @@ def _advisor_pass_score(
     return passed, score
 
 
-def run_advisor_stage(
-    root_dir: Path,
-    papers: list[PaperRecord],
-    advisor_models: tuple[str, ...],
-    required_passes: int = 3,
-) -> list[PaperRecord]:
-    touched: list[PaperRecord] = []
-
+def _advisor_queue(papers: list[PaperRecord]) -> list[PaperRecord]:
+    queue: list[PaperRecord] = []
     for paper in papers:
         if paper.source != "ai" or paper.status not in {
             "draft",
@@ -99,28 +98,106 @@ def run_advisor_stage(
             continue
         if paper.status == "idea":
             continue
+        queue.append(paper)
+    return queue
+
+
+def _submit_advisors(
+    root_dir: Path,
+    paper: PaperRecord,
+    advisor_models: tuple[str, ...],
+    executor: LLMExecutor,
+) -> list[Future]:
+    excerpt = _paper_excerpt(root_dir, paper)
+    return [
+        executor.submit(model, _advisor_pass_score, model, paper, excerpt)
+        for model in advisor_models
+    ]
+
+
+def _apply_advisors(
+    paper: PaperRecord,
+    futures: list[Future],
+    advisor_models: tuple[str, ...],
+    required_passes: int,
+) -> None:
+    passes = 0
+    scores = []
+    for future in futures:
+        passed, score = future.result()
+        scores.append(score)
+        if passed:
+            passes += 1
+
+    paper.advisor_total = len(advisor_models)
+    paper.advisor_passes = passes
+    paper.advisor_score = sum(scores) / len(scores) if scores else 0.0
 
+    if passes >= required_passes:
+        paper.status = "advisor_passed"
+    else:
+        paper.status = "advisor_failed"
+
+    paper.updated_at = utc_now_iso()
+
+
+def advise_paper(
+    root_dir: Path,
+    paper: PaperRecord,
+    advisor_models: tuple[str, ...],
+    required_passes: int = 3,
+    executor: LLMExecutor | None = None,
+) -> PaperRecord:
+    """Run every advisor on one paper and record the pass/fail outcome."""
+    executor = executor or LLMExecutor()
+    paper.integrity_flags = integrity_flags(root_dir, paper)
+    futures = _submit_advisors(root_dir, paper, advisor_models, executor)
+    _apply_advisors(paper, futures, advisor_models, required_passes)
+    return paper
+
+
+def run_advisor_stage(
+    root_dir: Path,
+    papers: list[PaperRecord],
+    advisor_models: tuple[str, ...],
+    required_passes: int = 3,
+    executor: LLMExecutor | None = None,
+    batch: BatchRunner | None = None,
+) -> list[PaperRecord]:
+    executor = executor or LLMExecutor()
+    queue = _advisor_queue(papers)
+
+    for paper in queue:
         paper.integrity_flags = integrity_flags(root_dir, paper)
-        excerpt = _paper_excerpt(root_dir, paper)
-
-        passes = 0
-        scores = []
-        for model in advisor_models:
-            passed, score = _advisor_pass_score(model, paper, excerpt)
-            scores.append(score)
-            if passed:
-                passes += 1
-
-        paper.advisor_total = len(advisor_models)
-        paper.advisor_passes = passes
-        paper.advisor_score = sum(scores) / len(scores) if scores else 0.0
-
-        if passes >= required_passes:
-            paper.status = "advisor_passed"
-        else:
-            paper.status = "advisor_failed"
-
-        paper.updated_at = utc_now_iso()
+
+    if batch is not None:
+        batch.prefetch(
+            (
+                (
+                    model,
+                    *advisor_prompts(
+                        paper.title,
+                        paper.track,
+                        paper.method,
+                        paper.integrity_flags,
+                        _paper_excerpt(root_dir, paper),
+                    ),
+                )
+                for paper in queue
+                for model in advisor_models
+            ),
+            stage="advisor",
+        )
+
+    # Submit every (paper, model) call up front, then collect the futures in
+    # queue/model order so aggregates do not depend on completion timing.
+    pending = [
+        _submit_advisors(root_dir, paper, advisor_models, executor) for paper in queue
+    ]
+
+    touched: list[PaperRecord] = []
+    for paper, futures in zip(queue, pending):
+        _apply_advisors(paper, futures, advisor_models, required_passes)
         touched.append(paper)
 
     return touched
@@ -138,62 +215,183 @@ def _recommendation_from_score(score: float) -> str:
     return "reject"
 
 
+def _reviewer_score(
+    model_name: str,
+    paper: PaperRecord,
+    excerpt: str,
+    base: float,
+) -> tuple[float, str]:
+    llm_result = reviewer_evaluate(
+        model_name=model_name,
+        paper_title=paper.title,
+        paper_track=paper.track,
+        paper_method=paper.method,
+        integrity_flags=paper.integrity_flags,
+        paper_excerpt=excerpt,
+    )
+    if llm_result is not None:
+        return llm_result.score, llm_result.recommendation
+
+    rnd = seeded_random(f"reviewer:{model_name}:{paper.id}:{paper.title}")
+    model_score = 60.0 + 35.0 * ((base + rnd.random()) / 2)
+    model_score -= min(12.0, 2.5 * len(paper.integrity_flags))
+    model_score = max(0.0, min(100.0, model_score))
+    return model_score, _recommendation_from_score(model_score)
+
+
+def review_paper(
+    root_dir: Path,
+    paper: PaperRecord,
+    reviewer_models: tuple[str, ...],
+    executor: LLMExecutor | None = None,
+) -> PaperRecord:
+    """Score one advisor-passed paper with every reviewer model."""
+    executor = executor or LLMExecutor()
+    excerpt = _paper_excerpt(root_dir, paper)
+    base = seeded_random(f"reviewer-base:{paper.id}").random()
+    futures = [
+        executor.submit(model, _reviewer_score, model, paper, excerpt, base)
+        for model in reviewer_models
+    ]
+
+    score_values = []
+    recommendations = []
+    for future in futures:
+        score, recommendation = future.result()
+        score_values.append(score)
+        recommendations.append(recommendation)
+
+    overall = sum(score_values) / max(1, len(score_values))
+    overall = max(0.0, min(100.0, overall))
+
+    rec_counts: dict[str, int] = {}
+    for rec in recommendations:
+        rec_counts[rec] = rec_counts.get(rec, 0) + 1
+    if rec_counts:
+        selected_rec = sorted(
+            rec_counts.items(),
+            key=lambda item: (item[1], item[0]),
+            reverse=True,
+        )[0][0]
+    else:
+        selected_rec = _recommendation_from_score(overall)
+
+    paper.reviewer_score = overall
+    paper.review_recommendation = selected_rec
+    paper.status = "reviewed"
+    paper.updated_at = utc_now_iso()
+    return paper
+
+
 def run_reviewer_stage(
     root_dir: Path,
     papers: list[PaperRecord],
     reviewer_models: tuple[str, ...],
+    executor: LLMExecutor | None = None,
+    batch: BatchRunner | None = None,
 ) -> list[PaperRecord]:
-    touched: list[PaperRecord] = []
+    queue = [
+        paper
+        for paper in papers
+        if paper.source == "ai" and paper.status == "advisor_passed"
+    ]
 
-    for paper in papers:
-        if paper.source != "ai" or paper.status != "advisor_passed":
-            continue
+    if batch is not None:
+        batch.prefetch(
+            (
+                (
+                    model,
+                    *reviewer_prompts(
+                        paper.title,
+                        paper.track,
+                        paper.method,
+                        paper.integrity_flags,
+                        _paper_excerpt(root_dir, paper),
+                    ),
+                )
+                for paper in queue
+                for model in reviewer_models
+            ),
+            stage="reviewer",
+        )
 
-        excerpt = _paper_excerpt(root_dir, paper)
-        base = seeded_random(f"reviewer-base:{paper.id}").random()
-        score_values = []
-        recommendations = []
-
-        for model in reviewer_models:
-            llm_result = reviewer_evaluate(
-                model_name=model,
-                paper_title=paper.title,
-                paper_track=paper.track,
-                paper_method=paper.method,
-                integrity_flags=paper.integrity_flags,
-                paper_excerpt=excerpt,
-            )
-            if llm_result is not None:
-                score_values.append(llm_result.score)
-                recommendations.append(llm_result.recommendation)
-                continue
+    return [review_paper(root_dir, paper, reviewer_models, executor) for paper in queue]
 
-            rnd = seeded_random(f"reviewer:{model}:{paper.id}:{paper.title}")
-            model_score = 60.0 + 35.0 * ((base + rnd.random()) / 2)
-            model_score -= min(12.0, 2.5 * len(paper.integrity_flags))
-            model_score = max(0.0, min(100.0, model_score))
-            score_values.append(model_score)
-            recommendations.append(_recommendation_from_score(model_score))
-
-        overall = sum(score_values) / max(1, len(score_values))
-        overall = max(0.0, min(100.0, overall))
-
-        rec_counts: dict[str, int] = {}
-        for rec in recommendations:
-            rec_counts[rec] = rec_counts.get(rec, 0) + 1
-        if rec_counts:
-            selected_rec = sorted(
-                rec_counts.items(),
-                key=lambda item: (item[1], item[0]),
-                reverse=True,
-            )[0][0]
-        else:
-            selected_rec = _recommendation_from_score(overall)
-
-        paper.reviewer_score = overall
-        paper.review_recommendation = selected_rec
-        paper.status = "reviewed"
-        paper.updated_at = utc_now_iso()
-        touched.append(paper)
 
-    return touched
+_DONE = object()
+
+
+def run_review_pipeline(
+    root_dir: Path,
+    advisor_queue: list[PaperRecord],
+    review_backlog: list[PaperRecord],
+    advisor_models: tuple[str, ...],
+    reviewer_models: tuple[str, ...],
+    required_passes: int = 3,
+    executor: LLMExecutor | None = None,
+    workers: int = 4,
+    queue_size: int = 8,
+) -> tuple[list[PaperRecord], list[PaperRecord]]:
+    """Advisor and reviewer stages running at once, linked by a bounded queue.
+
+    Each paper is handed to the reviewers as soon as its own advisors pass
+    it, while other papers are still being advised; ``review_backlog``
+    (papers that passed in an earlier cycle) is reviewed alongside. Per-paper
+    results are the same as with the two stage functions, since every score
+    is computed from the paper alone. ``workers`` papers are in flight per
+    stage; the LLM calls themselves still go through ``executor``, so its
+    provider caps hold across both stages. Returns the advised and reviewed
+    papers, in catalog order.
+    """
+    executor = executor or LLMExecutor()
+    handoff: Queue = Queue(maxsize=max(1, queue_size))
+    workers = max(1, workers)
+    advised: list[PaperRecord] = []
+    reviewed: list[PaperRecord] = []
+    errors: list[BaseException] = []
+    lock = threading.Lock()
+
+    def advise(paper: PaperRecord) -> None:
+        advise_paper(root_dir, paper, advisor_models, required_passes, executor)
+        with lock:
+            advised.append(paper)
+        if paper.status == "advisor_passed":
+            handoff.put(paper)
+
+    def review_loop() -> None:
+        # Keep draining after a failure so producers never block on a full queue.
+        while True:
+            paper = handoff.get()
+            if paper is _DONE:
+                return
+            if errors:
+                continue
+            try:
+                review_paper(root_dir, paper, reviewer_models, executor)
+            except BaseException as exc:
+                errors.append(exc)
+                continue
+            with lock:
+                reviewed.append(paper)
+
+    reviewers = [threading.Thread(target=review_loop) for _ in range(workers)]
+    for thread in reviewers:
+        thread.start()
+    try:
+        for paper in review_backlog:
+            handoff.put(paper)
+        with ThreadPoolExecutor(max_workers=workers) as advisors:
+            for future in [advisors.submit(advise, paper) for paper in advisor_queue]:
+                future.result()
+    finally:
+        for _ in reviewers:
+            handoff.put(_DONE)
+        for thread in reviewers:
+            thread.join()
+    if errors:
+        raise errors[0]
+
+    order = {id(paper): pos for pos, paper in enumerate(review_backlog + advisor_queue)}
+    advised.sort(key=lambda paper: order[id(paper)])
+    reviewed.sort(key=lambda paper: order[id(paper)])
+    return advised, reviewed
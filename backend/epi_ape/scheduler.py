@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import heapq
+import math
+import random
+from bisect import bisect_left
+from typing import Protocol
+
+from .models import PaperRecord
+from .ratings import TS_BETA
+
+SCHEDULERS = ("random", "quality")
+
+# Typical value of TrueSkill's "W" factor for an evenly matched 1v1, used to
+# project how much a scheduled match will shrink a paper's variance.
+_EXPECTED_W = 0.5
+
+
+def match_quality(mu_a: float, sigma_a: float, mu_b: float, sigma_b: float) -> float:
+    """TrueSkill 1v1 match quality (draw probability proxy), in (0, 1]."""
+    c2 = 2 * TS_BETA**2 + sigma_a**2 + sigma_b**2
+    return math.sqrt(2 * TS_BETA**2 / c2) * math.exp(-((mu_a - mu_b) ** 2) / (2 * c2))
+
+
+class MatchScheduler(Protocol):
+    def schedule(
+        self,
+        ais: list[PaperRecord],
+        humans: list[PaperRecord],
+        match_count: int,
+        rnd: random.Random,
+    ) -> list[tuple[PaperRecord, PaperRecord]]: ...
+
+
+class RandomScheduler:
+    """Uniform AI x human pairs; the original tournament behaviour."""
+
+    def schedule(
+        self,
+        ais: list[PaperRecord],
+        humans: list[PaperRecord],
+        match_count: int,
+        rnd: random.Random,
+    ) -> list[tuple[PaperRecord, PaperRecord]]:
+        schedule = []
+        for _ in range(match_count):
+            ai_paper = ais[rnd.randrange(len(ais))]
+            human_paper = humans[rnd.randrange(len(humans))]
+            schedule.append((ai_paper, human_paper))
+        return schedule
+
+
+class MatchQualityScheduler:
+    """Spend matches where they teach the ratings the most.
+
+    AI papers sit in a max-heap keyed by their projected variance. Each pick
+    takes the most uncertain paper and pairs it with the human benchmark of
+    highest TrueSkill match quality among the ``window`` nearest by mu,
+    found by bisection over humans sorted by mu. The paper's variance is then
+    projected down as if the match had been played and it is pushed back, so
+    one round spreads matches over the uncertain papers instead of
+    re-scheduling the same one. Picks cost O(log n + window).
+
+    Papers whose projected sigma is at or below ``target_sigma`` drop out; if
+    all do, the round ends early with fewer matches.
+    """
+
+    def __init__(self, window: int = 4, target_sigma: float = 0.0) -> None:
+        self.window = max(1, window)
+        self.target_sigma = target_sigma
+
+    def schedule(
+        self,
+        ais: list[PaperRecord],
+        humans: list[PaperRecord],
+        match_count: int,
+        rnd: random.Random,
+    ) -> list[tuple[PaperRecord, PaperRecord]]:
+        ranked_humans = sorted(humans, key=lambda paper: (paper.mu, paper.id))
+        human_mus = [paper.mu for paper in ranked_humans]
+        human_load = [0] * len(ranked_humans)
+
+        heap: list[tuple[float, float, int]] = []
+        for pos, paper in enumerate(ais):
+            if paper.sigma > self.target_sigma:
+                heap.append((-(paper.sigma**2), rnd.random(), pos))
+        heapq.heapify(heap)
+
+        schedule: list[tuple[PaperRecord, PaperRecord]] = []
+        while heap and len(schedule) < match_count:
+            neg_var, _, pos = heapq.heappop(heap)
+            ai_paper = ais[pos]
+            var = -neg_var
+            sigma = math.sqrt(var)
+
+            centre = bisect_left(human_mus, ai_paper.mu)
+            lo = max(0, centre - self.window)
+            hi = min(len(ranked_humans), centre + self.window)
+            best = max(
+                range(lo, hi),
+                key=lambda idx: (
+                    match_quality(
+                        ai_paper.mu,
+                        sigma,
+                        ranked_humans[idx].mu,
+                        ranked_humans[idx].sigma,
+                    )
+                    / (1 + human_load[idx]),
+                    -idx,
+                ),
+            )
+            human_paper = ranked_humans[best]
+            human_load[best] += 1
+            schedule.append((ai_paper, human_paper))
+
+            c2 = 2 * TS_BETA**2 + var + human_paper.sigma**2
+            var *= 1 - var / c2 * _EXPECTED_W
+            if math.sqrt(var) > self.target_sigma:
+                heapq.heappush(heap, (-var, rnd.random(), pos))
+
+        return schedule
+
+
+def make_scheduler(name: str, target_sigma: float = 0.0) -> MatchScheduler:
+    if name == "quality":
+        return MatchQualityScheduler(target_sigma=target_sigma)
+    if name == "random":
+        return RandomScheduler()
+    raise ValueError(
+        f"Unknown match scheduler {name!r}; expected one of {', '.join(SCHEDULERS)}"
+    )
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from dataclasses import dataclass, field, fields
+from operator import attrgetter
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from .ids import IdAllocator
+from .models import PaperRecord
+from .storage import STATE_SCHEMA_VERSION, StateStore
+from .utils import dump_json, dumps_json, loads_json
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    status TEXT NOT NULL,
+    track TEXT NOT NULL,
+    conservative_score REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_papers_seq ON papers (seq);
+CREATE INDEX IF NOT EXISTS idx_papers_source_status ON papers (source, status, seq);
+CREATE INDEX IF NOT EXISTS idx_papers_status ON papers (status);
+CREATE INDEX IF NOT EXISTS idx_papers_track ON papers (track);
+CREATE INDEX IF NOT EXISTS idx_papers_score ON papers (conservative_score);
+CREATE TABLE IF NOT EXISTS paper_ids (
+    prefix TEXT PRIMARY KEY,
+    last INTEGER NOT NULL
+);
+"""
+
+
+# Every field but ``integrity_flags``, the one mutable field, which is
+# compared as a tuple so in-place edits are seen too.
+_scalar_fields = attrgetter(
+    *(item.name for item in fields(PaperRecord) if item.name != "integrity_flags")
+)
+
+
+def _fingerprint(paper: PaperRecord) -> tuple:
+    """Cheap snapshot of a paper's state for dirty checks (no ``asdict``)."""
+    return _scalar_fields(paper), tuple(paper.integrity_flags)
+
+
+class SqliteIdAllocator(IdAllocator):
+    """``IdAllocator`` keeping its counters in the store's ``paper_ids`` table.
+
+    Each update runs in a ``BEGIN IMMEDIATE`` transaction, which SQLite
+    serializes across processes.
+    """
+
+    def __init__(
+        self, connect: Callable[[], sqlite3.Connection], lock: threading.Lock
+    ) -> None:
+        super().__init__()
+        self._connect = connect
+        self._lock = lock
+
+    def _update(self, change: Callable[[dict[str, int]], None]) -> dict[str, int]:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute("SELECT prefix, last FROM paper_ids").fetchall()
+                counters = {str(prefix): int(last) for prefix, last in rows}
+                change(counters)
+                conn.executemany(
+                    "INSERT INTO paper_ids (prefix, last) VALUES (?, ?) "
+                    "ON CONFLICT(prefix) DO UPDATE SET last=excluded.last",
+                    sorted(counters.items()),
+                )
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+            return counters
+
+
+@dataclass
+class SqliteStateStore(StateStore):
+    """State store keeping papers in SQLite; matches and meta stay on disk.
+
+    Paper order is preserved through a ``seq`` column, since stages and the
+    tournament schedule depend on catalog order. ``save_papers`` only
+    upserts records whose state differs from what was last loaded or saved.
+    ``close`` rewrites ``papers.json`` from the table when anything was
+    saved, so the json backend (and the committed state) stays current.
+    """
+
+    _snapshots: dict[str, tuple] = field(default_factory=dict, repr=False)
+    _records: dict[str, PaperRecord] = field(default_factory=dict, repr=False)
+    _conn: sqlite3.Connection | None = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _unexported: bool = field(default=False, repr=False)
+
+    @property
+    def db_path(self) -> Path:
+        return self.state_dir / "papers.sqlite3"
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.init_dirs()
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        if self._unexported:
+            self.export_papers()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _row_count(self) -> int:
+        return int(self._connect().execute("SELECT COUNT(*) FROM papers").fetchone()[0])
+
+    def _remember(self, papers: list[PaperRecord]) -> None:
+        for paper in papers:
+            self._records[paper.id] = paper
+            self._snapshots[paper.id] = _fingerprint(paper)
+
+    def load_papers(self) -> list[PaperRecord]:
+        with self._lock:
+            if self._row_count() == 0 and self.papers_path.exists():
+                self._upsert(super().load_papers())
+
+            rows = self._connect().execute("SELECT payload FROM papers ORDER BY seq")
+            papers = [PaperRecord.from_state_dict(loads_json(row[0])) for row in rows]
+            self._records.clear()
+            self._snapshots.clear()
+            self._remember(papers)
+            return papers
+
+    def id_allocator(self) -> IdAllocator:
+        return SqliteIdAllocator(self._connect, self._lock)
+
+    def iter_papers(self) -> Iterator[PaperRecord]:
+        """Stream papers in catalog order; they are not tracked by ``save_papers``."""
+        with self._lock:
+            if self._row_count() == 0:
+                cursor = None
+            else:
+                cursor = self._connect().execute(
+                    "SELECT payload FROM papers ORDER BY seq"
+                )
+        if cursor is None:
+            yield from super().iter_papers()
+            return
+
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(500)
+            if not rows:
+                return
+            for row in rows:
+                yield PaperRecord.from_state_dict(loads_json(row[0]))
+
+    def _upsert(self, papers: list[PaperRecord]) -> None:
+        # New rows get fresh seq values; the conflict clause leaves the seq of
+        # existing rows untouched, so catalog order never changes.
+        conn = self._connect()
+        top = conn.execute("SELECT COALESCE(MAX(seq), -1) FROM papers").fetchone()[0]
+        rows = [
+            (
+                paper.id,
+                int(top) + 1 + offset,
+                paper.source,
+                paper.status,
+                paper.track,
+                paper.conservative_score(),
+                dumps_json(paper.to_state_dict()).decode("utf-8"),
+            )
+            for offset, paper in enumerate(papers)
+        ]
+
+        with conn:
+            conn.executemany(
+                "INSERT INTO papers (id, seq, source, status, track, conservative_score, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET source=excluded.source, status=excluded.status, "
+                "track=excluded.track, conservative_score=excluded.conservative_score, "
+                "payload=excluded.payload",
+                rows,
+            )
+
+    def dirty_papers(self, papers: list[PaperRecord]) -> list[PaperRecord]:
+        return [
+            paper
+            for paper in papers
+            if self._snapshots.get(paper.id) != _fingerprint(paper)
+        ]
+
+    def save_papers(self, papers: list[PaperRecord]) -> None:
+        with self._lock:
+            dirty = self.dirty_papers(papers)
+            if not dirty:
+                return
+            self._upsert(dirty)
+            self._remember(dirty)
+            self._unexported = True
+
+    def export_papers(self) -> None:
+        """Write every paper, in catalog order, to ``papers.json``."""
+        with self._lock:
+            rows = self._connect().execute("SELECT payload FROM papers ORDER BY seq")
+            dump_json(
+                self.papers_path,
+                {
+                    "schema_version": STATE_SCHEMA_VERSION,
+                    "papers": [loads_json(row[0]) for row in rows],
+                },
+            )
+            self._unexported = False
+
+    def paper_ids(
+        self,
+        source: str | None = None,
+        statuses: tuple[str, ...] = (),
+        track: str | None = None,
+        min_score: float | None = None,
+        order_by_score: bool = False,
+        limit: int | None = None,
+    ) -> list[str]:
+        clauses = []
+        params: list[Any] = []
+        if source is not None:
+            clauses.append("source = ?")
+            params.append(source)
+        if statuses:
+            clauses.append(f"status IN ({', '.join('?' for _ in statuses)})")
+            params.extend(statuses)
+        if track is not None:
+            clauses.append("track = ?")
+            params.append(track)
+        if min_score is not None:
+            clauses.append("conservative_score >= ?")
+            params.append(min_score)
+
+        sql = "SELECT id FROM papers"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += (
+            " ORDER BY conservative_score DESC" if order_by_score else " ORDER BY seq"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            return [row[0] for row in self._connect().execute(sql, params)]
+
+    def select_papers(
+        self, papers: list[PaperRecord], source: str, statuses: tuple[str, ...]
+    ) -> list[PaperRecord]:
+        # Flush in-memory changes first so the index reflects this cycle.
+        self.save_papers(papers)
+        return [
+            self._records[paper_id]
+            for paper_id in self.paper_ids(source=source, statuses=statuses)
+            if paper_id in self._records
+        ]
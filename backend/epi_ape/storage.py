@@ -1,15 +1,52 @@
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Iterable, Iterator
 
+from .ids import IdAllocator
+from .matchtable import MatchTable
 from .models import MatchRecord, PaperRecord
-from .utils import dump_json, ensure_dir, load_json
+from .titleindex import DEFAULT_THRESHOLD, TitleIndex
+from .utils import (
+    dump_json,
+    dumps_json,
+    ensure_dir,
+    fsync_file,
+    iter_json_records,
+    load_json,
+    loads_json,
+    write_atomic,
+)
+
+# Version of the papers.json layout. Version 1 files are a bare array whose
+# rows may still use web-format (camelCase) keys; version 2 wraps the rows,
+# exactly as ``PaperRecord.to_state_dict`` writes them, in an object.
+STATE_SCHEMA_VERSION = 2
+
+# Values accepted for ``EPI_APE_STATE_BACKEND``.
+STATE_BACKENDS = ("json", "sqlite")
+
+
+def _paper_rows(raw: Any) -> tuple[Iterable[dict], bool]:
+    """Rows of a loaded papers file and whether they are in the current schema."""
+    if isinstance(raw, dict):
+        current = raw.get("schema_version") == STATE_SCHEMA_VERSION
+        return raw.get("papers", []), current
+    return raw, False
+
+
+def _paper(row: dict, current: bool) -> PaperRecord:
+    if current:
+        return PaperRecord.from_state_dict(row)
+    return PaperRecord.from_dict(row)
 
 
 @dataclass
 class StateStore:
     state_dir: Path
+    match_segment_size: int = 10000
 
     @property
     def papers_path(self) -> Path:
@@ -17,31 +54,244 @@ class StateStore:
 
     @property
     def matches_path(self) -> Path:
+        """Legacy single-file match history, migrated on first append."""
         return self.state_dir / "matches.json"
 
+    @property
+    def matches_dir(self) -> Path:
+        return self.state_dir / "matches"
+
     @property
     def meta_path(self) -> Path:
         return self.state_dir / "meta.json"
 
+    @property
+    def cycle_path(self) -> Path:
+        """Progress of an unfinished ``run_cycle``; removed when it completes."""
+        return self.state_dir / "cycle.json"
+
+    @property
+    def ids_path(self) -> Path:
+        return self.state_dir / "ids.json"
+
+    @property
+    def title_index_path(self) -> Path:
+        return self.state_dir / "title_index.json"
+
     def init_dirs(self) -> None:
         ensure_dir(self.state_dir)
 
+    def id_allocator(self) -> IdAllocator:
+        """Persistent paper id counters shared by every worker on this state."""
+        return IdAllocator(self.ids_path)
+
+    def load_title_index(
+        self, papers: Iterable[PaperRecord], threshold: float = DEFAULT_THRESHOLD
+    ) -> TitleIndex:
+        """The saved title index, brought up to date with ``papers``."""
+        titles = TitleIndex.load(self.title_index_path, threshold)
+        titles.sync(papers)
+        return titles
+
+    def save_title_index(self, titles: TitleIndex) -> None:
+        titles.save(self.title_index_path)
+
     def load_papers(self) -> list[PaperRecord]:
-        raw = load_json(self.papers_path, default=[])
-        return [PaperRecord.from_dict(item) for item in raw]
+        rows, current = _paper_rows(load_json(self.papers_path, default=[]))
+        return [_paper(row, current) for row in rows]
+
+    def iter_papers(self) -> Iterator[PaperRecord]:
+        """Stream papers off disk for read-only passes (no ``.bak`` recovery)."""
+        header, rows = iter_json_records(self.papers_path)
+        current = header.get("schema_version") == STATE_SCHEMA_VERSION
+        for row in rows:
+            yield _paper(row, current)
 
     def save_papers(self, papers: list[PaperRecord]) -> None:
-        dump_json(self.papers_path, [paper.to_state_dict() for paper in papers])
+        dump_json(
+            self.papers_path,
+            {
+                "schema_version": STATE_SCHEMA_VERSION,
+                "papers": [paper.to_state_dict() for paper in papers],
+            },
+        )
+
+    def select_papers(
+        self, papers: list[PaperRecord], source: str, statuses: tuple[str, ...]
+    ) -> list[PaperRecord]:
+        """Return one stage's work queue, in catalog order."""
+        return [
+            paper
+            for paper in papers
+            if paper.source == source and paper.status in statuses
+        ]
+
+    def close(self) -> None:
+        return None
+
+    def _segments(self) -> list[Path]:
+        if not self.matches_dir.exists():
+            return []
+        return sorted(self.matches_dir.glob("matches-*.jsonl"))
+
+    def _segment_path(self, number: int) -> Path:
+        return self.matches_dir / f"matches-{number:06d}.jsonl"
+
+    @staticmethod
+    def _read_segment(path: Path) -> Iterator[MatchRecord]:
+        with path.open("rb") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    payload = loads_json(line)
+                except ValueError:
+                    # A crash mid-append can leave one truncated line behind.
+                    continue
+                # Segments only ever hold ``to_state_dict`` rows.
+                try:
+                    record = MatchRecord.from_state_dict(payload)
+                except ValueError as exc:
+                    raise ValueError(f"{path}: {exc}") from None
+                yield record
+
+    def iter_matches(self) -> Iterator[MatchRecord]:
+        segments = self._segments()
+        if not segments:
+            for item in iter_json_records(self.matches_path)[1]:
+                try:
+                    record = MatchRecord.from_dict(item)
+                except ValueError as exc:
+                    raise ValueError(f"{self.matches_path}: {exc}") from None
+                yield record
+            return
+
+        for segment in segments:
+            yield from self._read_segment(segment)
+
+    def has_matches(self) -> bool:
+        return bool(self._segments()) or self.matches_path.exists()
 
     def load_matches(self) -> list[MatchRecord]:
-        raw = load_json(self.matches_path, default=[])
-        return [MatchRecord.from_dict(item) for item in raw]
+        return list(self.iter_matches())
+
+    def load_match_table(self) -> MatchTable:
+        """The whole history as columns, built while streaming it off disk."""
+        return MatchTable.from_matches(self.iter_matches())
+
+    def tail_matches(self, count: int) -> list[MatchRecord]:
+        """Return the last ``count`` matches, reading only the newest segments."""
+        segments = self._segments()
+        if not segments:
+            return self.load_matches()[-count:] if count > 0 else []
+
+        tail: deque[MatchRecord] = deque(maxlen=max(0, count))
+        chunks: list[list[MatchRecord]] = []
+        collected = 0
+        for segment in reversed(segments):
+            if collected >= count:
+                break
+            chunk = list(self._read_segment(segment))
+            chunks.append(chunk)
+            collected += len(chunk)
+        for chunk in reversed(chunks):
+            tail.extend(chunk)
+        return list(tail)
+
+    def append_matches(self, matches: Iterable[MatchRecord]) -> int:
+        """Append new matches to the newest segment, rolling over when full."""
+        pending = [match.to_state_dict() for match in matches]
+        if not pending:
+            return 0
+
+        if not self._segments() and self.matches_path.exists():
+            self.compact_matches()
+
+        ensure_dir(self.matches_dir)
+        segments = self._segments()
+        number = int(segments[-1].stem.split("-")[-1]) if segments else 1
+        path = self._segment_path(number)
+        used = 0
+        needs_newline = False
+        if path.exists():
+            data = path.read_bytes()
+            used = sum(1 for line in data.splitlines() if line.strip())
+            needs_newline = bool(data) and not data.endswith(b"\n")
+
+        written = 0
+        while written < len(pending):
+            if used >= self.match_segment_size:
+                number += 1
+                path = self._segment_path(number)
+                used = 0
+                needs_newline = False
+
+            room = self.match_segment_size - used
+            batch = pending[written : written + room]
+            lines = b"".join(dumps_json(item) + b"\n" for item in batch)
+            with path.open("ab") as handle:
+                if needs_newline:
+                    handle.write(b"\n")
+                handle.write(lines)
+                fsync_file(handle)
+            used += len(batch)
+            written += len(batch)
+
+        return written
 
     def save_matches(self, matches: list[MatchRecord]) -> None:
-        dump_json(self.matches_path, [match.to_state_dict() for match in matches])
+        """Rewrite the whole history as full segments (used for compaction)."""
+        ensure_dir(self.matches_dir)
+        old = self._segments()
+        size = self.match_segment_size
+        chunks = [matches[idx : idx + size] for idx in range(0, len(matches), size)]
+
+        written: set[Path] = set()
+        for number, chunk in enumerate(chunks, start=1):
+            path = self._segment_path(number)
+            write_atomic(
+                path,
+                b"".join(dumps_json(match.to_state_dict()) + b"\n" for match in chunk),
+                keep_backup=False,
+            )
+            written.add(path)
+
+        for path in old:
+            if path not in written:
+                path.unlink(missing_ok=True)
+        if self.matches_path.exists():
+            self.matches_path.unlink()
+
+    def compact_matches(self) -> int:
+        """Merge segments (and any legacy ``matches.json``) into full segments."""
+        matches = self.load_matches()
+        self.save_matches(matches)
+        return len(matches)
 
     def load_meta(self) -> dict:
         return load_json(self.meta_path, default={})
 
     def save_meta(self, meta: dict) -> None:
         dump_json(self.meta_path, meta)
+
+    def load_cycle_checkpoint(self) -> dict | None:
+        return load_json(self.cycle_path, default=None)
+
+    def save_cycle_checkpoint(self, checkpoint: dict) -> None:
+        dump_json(self.cycle_path, checkpoint, keep_backup=False)
+
+    def clear_cycle_checkpoint(self) -> None:
+        self.cycle_path.unlink(missing_ok=True)
+
+
+def open_store(state_dir: Path, backend: str = "json") -> StateStore:
+    if backend == "sqlite":
+        from .sqlite_store import SqliteStateStore
+
+        return SqliteStateStore(state_dir)
+    if backend == "json":
+        return StateStore(state_dir)
+    raise ValueError(
+        f"Unknown state backend {backend!r}; expected one of {', '.join(STATE_BACKENDS)}"
+    )
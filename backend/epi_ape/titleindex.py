@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import random
+import re
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Iterable
+
+from .models import PaperRecord
+from .utils import dump_json, load_json
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+TITLE_INDEX_VERSION = 2
+SHINGLE_SIZE = 3
+BANDS = 16
+ROWS = 4
+MINHASH_SEED = 1
+DEFAULT_THRESHOLD = 0.8
+
+# Permutations are (a * x + b) mod p over 32-bit shingle hashes, which keeps
+# every product below 2**63 for numpy's uint64.
+_PRIME = (1 << 31) - 1
+_rng = random.Random(MINHASH_SEED)
+_COEFFS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(BANDS * ROWS)
+]
+if np is not None:
+    _A = np.array([a for a, _ in _COEFFS], dtype=np.uint64)[:, None]
+    _B = np.array([b for _, b in _COEFFS], dtype=np.uint64)[:, None]
+
+# Letters and digits in any script; everything else separates words.
+_NON_ALNUM = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_title(title: str) -> str:
+    return " ".join(_NON_ALNUM.sub(" ", title.casefold()).split())
+
+
+def shingles(title: str) -> set[str]:
+    """Character ``SHINGLE_SIZE``-grams of the normalized, space-padded title."""
+    text = f" {normalize_title(title)} "
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i : i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _signature(grams: set[str]) -> list[int]:
+    hashes = [zlib.crc32(gram.encode("utf-8")) for gram in grams]
+    if np is not None:
+        x = np.array(hashes, dtype=np.uint64)[None, :]
+        return ((_A * x + _B) % _PRIME).min(axis=1).tolist()
+    return [min((a * x + b) % _PRIME for x in hashes) for a, b in _COEFFS]
+
+
+def band_keys(grams: set[str]) -> list[int]:
+    """One LSH bucket key per band of the MinHash signature."""
+    signature = _signature(grams)
+    return [
+        zlib.crc32(struct.pack(f"<{ROWS}Q", *signature[i : i + ROWS]))
+        for i in range(0, BANDS * ROWS, ROWS)
+    ]
+
+
+class TitleIndex:
+    """MinHash/LSH index of paper titles for near-duplicate checks.
+
+    Each title is reduced to character shingles and a MinHash signature, cut
+    into ``BANDS`` bands of ``ROWS`` rows. Titles sharing a band key are
+    candidates, and only candidates are compared by exact Jaccard similarity,
+    so a lookup costs a few dict probes rather than a scan of every title.
+    With the defaults, pairs at similarity 0.8 collide with probability
+    above 0.999. Band keys persist with the titles, so reloading the index
+    only hashes titles added or changed since it was saved.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD) -> None:
+        self.threshold = threshold
+        self.titles: dict[str, str] = {}
+        self._keys: dict[str, list[int]] = {}
+        self._buckets: list[dict[int, list[str]]] = [{} for _ in range(BANDS)]
+        self._shingles: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def __contains__(self, paper_id: str) -> bool:
+        return paper_id in self.titles
+
+    def _insert(self, paper_id: str, title: str, keys: list[int]) -> None:
+        self.titles[paper_id] = title
+        self._keys[paper_id] = keys
+        for band, key in zip(self._buckets, keys):
+            band.setdefault(key, []).append(paper_id)
+
+    def add(self, paper_id: str, title: str) -> None:
+        if self.titles.get(paper_id) == title:
+            return
+        self.remove(paper_id)
+        grams = shingles(title)
+        self._shingles[paper_id] = grams
+        self._insert(paper_id, title, band_keys(grams))
+
+    def remove(self, paper_id: str) -> None:
+        if paper_id not in self.titles:
+            return
+        del self.titles[paper_id]
+        self._shingles.pop(paper_id, None)
+        for band, key in zip(self._buckets, self._keys.pop(paper_id)):
+            bucket = band[key]
+            bucket.remove(paper_id)
+            if not bucket:
+                del band[key]
+
+    def find_similar(self, title: str) -> str | None:
+        """Id of an indexed title at least ``threshold`` similar, if any."""
+        grams = shingles(title)
+        checked: set[str] = set()
+        for band, key in zip(self._buckets, band_keys(grams)):
+            for paper_id in band.get(key, ()):
+                if paper_id in checked:
+                    continue
+                checked.add(paper_id)
+                other = self._shingles.get(paper_id)
+                if other is None:
+                    other = self._shingles[paper_id] = shingles(self.titles[paper_id])
+                if jaccard(grams, other) >= self.threshold:
+                    return paper_id
+        return None
+
+    def sync(self, papers: Iterable[PaperRecord]) -> None:
+        """Index new or retitled papers and drop ones no longer present."""
+        current = {paper.id: paper.title for paper in papers}
+        for paper_id in [pid for pid in self.titles if pid not in current]:
+            self.remove(paper_id)
+        for paper_id, title in current.items():
+            self.add(paper_id, title)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": TITLE_INDEX_VERSION,
+            "shingle_size": SHINGLE_SIZE,
+            "bands": BANDS,
+            "rows": ROWS,
+            "seed": MINHASH_SEED,
+            "papers": [
+                [paper_id, title, self._keys[paper_id]]
+                for paper_id, title in self.titles.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(
+        cls, payload: dict[str, Any], threshold: float = DEFAULT_THRESHOLD
+    ) -> "TitleIndex":
+        index = cls(threshold)
+        params = (
+            payload.get("version"),
+            payload.get("shingle_size"),
+            payload.get("bands"),
+            payload.get("rows"),
+            payload.get("seed"),
+        )
+        if params != (TITLE_INDEX_VERSION, SHINGLE_SIZE, BANDS, ROWS, MINHASH_SEED):
+            # Keys from other parameters are not comparable; ``sync`` rebuilds.
+            return index
+        for paper_id, title, keys in payload.get("papers", []):
+            index._insert(paper_id, title, keys)
+        return index
+
+    @classmethod
+    def load(cls, path: Path, threshold: float = DEFAULT_THRESHOLD) -> "TitleIndex":
+        return cls.from_dict(load_json(path, default={}), threshold)
+
+    def save(self, path: Path) -> None:
+        dump_json(path, self.to_dict())
+
+
+def index_for(papers: Iterable[PaperRecord], titles: TitleIndex | None) -> TitleIndex:
+    """``titles`` if given, else a fresh index over ``papers``."""
+    if titles is not None:
+        return titles
+    titles = TitleIndex()
+    titles.sync(papers)
+    return titles
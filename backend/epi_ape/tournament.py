@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from typing import Callable
 
+from .concurrency import LLMExecutor
+from .llm import JudgeResult
 from .llm import judge_pair as llm_judge_pair
 from .models import MatchRecord, PaperRecord
+from .scheduler import MatchScheduler, RandomScheduler
 from .utils import seeded_random
 
 try:
@@ -35,13 +39,10 @@ def _judged_winner(
     return "paperA" if margin > 0 else "paperB"
 
 
-def judge_pair_position_swapped(
-    a: PaperRecord,
-    b: PaperRecord,
-    seed_key: str,
-    judge_model: str,
-) -> tuple[str, bool, str]:
-    first_llm = llm_judge_pair(
+def _llm_verdict(
+    a: PaperRecord, b: PaperRecord, judge_model: str
+) -> JudgeResult | None:
+    return llm_judge_pair(
         model_name=judge_model,
         paper_a_title=a.title,
         paper_a_track=a.track,
@@ -55,21 +56,26 @@ def judge_pair_position_swapped(
         paper_b_reviewer=b.reviewer_score,
     )
 
-    if first_llm is not None:
-        second_llm = llm_judge_pair(
-            model_name=judge_model,
-            paper_a_title=b.title,
-            paper_a_track=b.track,
-            paper_a_method=b.method,
-            paper_a_advisor=b.advisor_score,
-            paper_a_reviewer=b.reviewer_score,
-            paper_b_title=a.title,
-            paper_b_track=a.track,
-            paper_b_method=a.method,
-            paper_b_advisor=a.advisor_score,
-            paper_b_reviewer=a.reviewer_score,
-        )
 
+def judge_pair_position_swapped(
+    a: PaperRecord,
+    b: PaperRecord,
+    seed_key: str,
+    judge_model: str,
+) -> tuple[str, bool, str]:
+    first_llm = _llm_verdict(a, b, judge_model)
+    second_llm = _llm_verdict(b, a, judge_model) if first_llm is not None else None
+    return _resolve_swapped(a, b, seed_key, first_llm, second_llm)
+
+
+def _resolve_swapped(
+    a: PaperRecord,
+    b: PaperRecord,
+    seed_key: str,
+    first_llm: JudgeResult | None,
+    second_llm: JudgeResult | None,
+) -> tuple[str, bool, str]:
+    if first_llm is not None:
         if second_llm is None:
             winner = first_llm.winner
             return winner, winner != "tie", first_llm.rationale
@@ -180,35 +186,124 @@ class TournamentStats:
     ties: int
 
 
+@dataclass
+class TournamentProgress:
+    """Where a round stands: its schedule (as paper ids) and matches done.
+
+    ``seed_base`` is the match count the round started from; match seeds are
+    derived from it, so a resumed round judges the remaining pairs exactly
+    as the original run would have.
+    """
+
+    seed_base: int
+    schedule: list[tuple[str, str]] = field(default_factory=list)
+    done: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "seed_base": self.seed_base,
+            "schedule": [list(pair) for pair in self.schedule],
+            "done": self.done,
+        }
+
+    @classmethod
+    def from_dict(cls, raw: dict) -> "TournamentProgress":
+        return cls(
+            seed_base=int(raw.get("seed_base", 0)),
+            schedule=[(str(a), str(b)) for a, b in raw.get("schedule", [])],
+            done=int(raw.get("done", 0)),
+        )
+
+
 def run_tournament_round(
     papers: list[PaperRecord],
     existing_matches: list[MatchRecord],
     judge_model: str,
     match_count: int,
+    executor: LLMExecutor | None = None,
+    scheduler: MatchScheduler | None = None,
+    progress: TournamentProgress | None = None,
+    on_checkpoint: (
+        Callable[[TournamentProgress, list[MatchRecord]], None] | None
+    ) = None,
+    checkpoint_every: int = 0,
 ) -> tuple[list[MatchRecord], TournamentStats]:
+    """Judge ``match_count`` AI-vs-human pairs and update ratings in place.
+
+    Pass ``progress`` from an interrupted round to finish its schedule
+    instead of drawing a new one. With ``checkpoint_every`` set,
+    ``on_checkpoint`` is called with the progress and the matches played so
+    far after every that many matches.
+    """
     humans, ais = _eligible_papers(papers)
-    if not humans or not ais:
-        return existing_matches, TournamentStats(0, 0, 0, 0)
+    if progress is None:
+        if not humans or not ais:
+            return existing_matches, TournamentStats(0, 0, 0, 0)
 
-    rnd = seeded_random(
-        f"tournament:{datetime.now(timezone.utc).strftime('%Y-%m-%d')}:{len(existing_matches)}"
-    )
+        rnd = seeded_random(
+            f"tournament:{datetime.now(timezone.utc).strftime('%Y-%m-%d')}:{len(existing_matches)}"
+        )
+        scheduler = scheduler or RandomScheduler()
+        schedule = scheduler.schedule(ais, humans, match_count, rnd)
+        progress = TournamentProgress(
+            seed_base=len(existing_matches),
+            schedule=[(a.id, b.id) for a, b in schedule],
+        )
+    else:
+        by_id = {paper.id: paper for paper in papers}
+        schedule = [
+            (by_id[a], by_id[b]) if a in by_id and b in by_id else None
+            for a, b in progress.schedule
+        ]
+    start = progress.done
+
+    # Concurrent mode sends both position-swapped calls of every scheduled
+    # match at once. Verdicts are still resolved and rated in schedule order,
+    # since the simulated judge reads ratings updated by earlier matches.
+    verdicts = None
+    if executor is not None and executor.concurrent:
+        verdicts = [
+            (
+                (
+                    executor.submit(
+                        judge_model, _llm_verdict, pair[0], pair[1], judge_model
+                    ),
+                    executor.submit(
+                        judge_model, _llm_verdict, pair[1], pair[0], judge_model
+                    ),
+                )
+                if pair is not None and idx >= start
+                else None
+            )
+            for idx, pair in enumerate(schedule)
+        ]
 
     new_matches: list[MatchRecord] = []
     ai_wins = 0
     human_wins = 0
     ties = 0
 
-    for idx in range(match_count):
-        ai_paper = ais[rnd.randrange(len(ais))]
-        human_paper = humans[rnd.randrange(len(humans))]
-
-        winner, consistent, rationale = judge_pair_position_swapped(
-            ai_paper,
-            human_paper,
-            seed_key=f"{ai_paper.id}:{human_paper.id}:{len(existing_matches) + idx}",
-            judge_model=judge_model,
-        )
+    for idx in range(start, len(schedule)):
+        pair = schedule[idx]
+        if pair is None:
+            # A paper in a resumed schedule no longer exists.
+            continue
+        ai_paper, human_paper = pair
+        seed_key = f"{ai_paper.id}:{human_paper.id}:{progress.seed_base + idx}"
+        if verdicts is None:
+            winner, consistent, rationale = judge_pair_position_swapped(
+                ai_paper,
+                human_paper,
+                seed_key=seed_key,
+                judge_model=judge_model,
+            )
+        else:
+            first_future, second_future = verdicts[idx]
+            first_llm = first_future.result()
+            second_llm = second_future.result() if first_llm is not None else None
+            winner, consistent, rationale = _resolve_swapped(
+                ai_paper, human_paper, seed_key, first_llm, second_llm
+            )
 
         _update_rating_trueskill(ai_paper, human_paper, winner)
 
@@ -233,7 +328,7 @@ def run_tournament_round(
         rationale = rationale[:240]
 
         new_matches.append(
-            MatchRecord(
+            MatchRecord.create(
                 paper_a=ai_paper.id,
                 paper_b=human_paper.id,
                 winner=winner,
@@ -244,5 +339,11 @@ def run_tournament_round(
             )
         )
 
+        if on_checkpoint is not None and checkpoint_every > 0:
+            if (idx + 1 - start) % checkpoint_every == 0 and idx + 1 < len(schedule):
+                progress.done = idx + 1
+                on_checkpoint(progress, new_matches)
+
+    progress.done = len(schedule)
     all_matches = existing_matches + new_matches
     return all_matches, TournamentStats(len(new_matches), ai_wins, human_wins, ties)
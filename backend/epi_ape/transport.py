@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import http.client
+import io
+import threading
+import time
+from dataclasses import dataclass
+from email.message import Message
+from typing import Any
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+from urllib.request import Request, getproxies, proxy_bypass, urlopen
+
+USER_AGENT = "EPI-APE/0.1 (+https://github.com/)"
+
+# Errors raised when a kept-alive socket was closed by the server between
+# requests. A reused connection failing this way is retried once on a fresh one.
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+@dataclass
+class HttpResponse:
+    status: int
+    headers: Message
+    body: bytes
+
+    def text(self) -> str:
+        charset = self.headers.get_content_charset() or "utf-8"
+        return self.body.decode(charset, errors="replace")
+
+
+class HttpPool:
+    """Keep-alive HTTP(S) connections, reused per (scheme, host, port).
+
+    Connections are checked out for the duration of one request, so
+    concurrent callers never share a socket. At most ``max_per_host`` idle
+    connections are kept per host; extras are closed when returned.
+    """
+
+    def __init__(self, max_per_host: int = 8, timeout: float = 60.0) -> None:
+        self.max_per_host = max(1, max_per_host)
+        self.timeout = timeout
+        self._idle: dict[tuple[str, str, int], list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.connect_seconds = 0.0
+
+    def _checkout(
+        self, key: tuple[str, str, int], timeout: float
+    ) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+
+        scheme, host, port = key
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(host, port, timeout=timeout)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+
+        started = time.perf_counter()
+        conn.connect()
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.connections_opened += 1
+            self.connect_seconds += elapsed
+        return conn, False
+
+    def _checkin(
+        self, key: tuple[str, str, int], conn: http.client.HTTPConnection
+    ) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str] | None = None,
+        body: bytes | None = None,
+        timeout: float | None = None,
+    ) -> HttpResponse:
+        """Send one request; raise ``HTTPError`` on 4xx/5xx like ``urlopen``."""
+        timeout = self.timeout if timeout is None else timeout
+        headers = {"User-Agent": USER_AGENT, **(headers or {})}
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        host = parts.hostname or ""
+
+        proxies = getproxies()
+        if scheme not in {"http", "https"} or (
+            scheme in proxies and not proxy_bypass(host)
+        ):
+            return self._request_via_urlopen(method, url, headers, body, timeout)
+
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, host, port)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+
+        with self._lock:
+            self.requests += 1
+
+        while True:
+            conn, reused = self._checkout(key, timeout)
+            try:
+                conn.request(method, target, body=body, headers=headers)
+                raw = conn.getresponse()
+                payload = raw.read()
+            except _STALE_ERRORS:
+                conn.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            break
+
+        if raw.will_close:
+            conn.close()
+        else:
+            self._checkin(key, conn)
+
+        response = HttpResponse(status=raw.status, headers=raw.headers, body=payload)
+        if response.status >= 400:
+            raise HTTPError(
+                url, response.status, raw.reason, raw.headers, io.BytesIO(payload)
+            )
+        return response
+
+    def _request_via_urlopen(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        body: bytes | None,
+        timeout: float,
+    ) -> HttpResponse:
+        with self._lock:
+            self.requests += 1
+            self.connections_opened += 1
+        request = Request(url, data=body, headers=headers, method=method)
+        with urlopen(request, timeout=timeout) as response:
+            return HttpResponse(
+                status=response.status,
+                headers=response.headers,
+                body=response.read(),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            idle = [conn for conns in self._idle.values() for conn in conns]
+            self._idle.clear()
+        for conn in idle:
+            conn.close()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connect_seconds": round(self.connect_seconds, 3),
+            }
+
+
+_default_pool = HttpPool()
+
+
+def default_pool() -> HttpPool:
+    return _default_pool
+
+
+def configure_http(max_per_host: int, timeout: float) -> HttpPool:
+    """Replace the shared pool used by every stage and return it."""
+    global _default_pool
+    previous = _default_pool
+    _default_pool = HttpPool(max_per_host=max_per_host, timeout=timeout)
+    previous.close()
+    return _default_pool
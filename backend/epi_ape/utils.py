@@ -2,11 +2,18 @@ from __future__ import annotations
 
 import hashlib
 import json
+import os
 import random
+import shutil
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
+from typing import Any, Iterator
+
+try:
+    import orjson
+except Exception:
+    orjson = None
 
 
 def seeded_random(key: str) -> random.Random:
@@ -25,34 +32,292 @@ def ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
+_fsync_enabled = True
+
+
+def set_fsync(enabled: bool) -> None:
+    """Turn fsync of state writes on or off (on by default)."""
+    global _fsync_enabled
+    _fsync_enabled = enabled
+
+
+def fsync_file(handle: Any) -> None:
+    handle.flush()
+    if _fsync_enabled:
+        os.fsync(handle.fileno())
+
+
+def fsync_dir(path: Path) -> None:
+    # Makes the rename itself durable; not supported everywhere (e.g. Windows).
+    if not _fsync_enabled:
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on ``path`` (created if needed) across processes."""
+    ensure_dir(path.parent)
+    with path.open("a+b") as handle:
+        if os.name == "nt":
+            import msvcrt
+
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+# Backups and set-aside corrupt files live in a hidden directory beside the
+# state files, so globs such as ``backend/state/*`` never pick them up.
+BACKUP_DIR = ".backups"
+
+
+def backup_path(path: Path) -> Path:
+    return path.parent / BACKUP_DIR / f"{path.name}.bak"
+
+
+def corrupt_path(path: Path) -> Path:
+    return path.parent / BACKUP_DIR / f"{path.name}.corrupt"
+
+
+def write_atomic(path: Path, data: bytes, keep_backup: bool = True) -> None:
+    """Replace ``path`` so readers see either the old or the new file, never a torn one.
+
+    The data goes to a temporary file in the same directory, is fsync'd and
+    renamed over the target. With ``keep_backup`` the previous generation is
+    kept as ``.backups/<name>.bak`` for ``load_json`` to fall back to.
+    """
+    ensure_dir(path.parent)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with tmp.open("wb") as handle:
+            handle.write(data)
+            fsync_file(handle)
+        if keep_backup and path.exists():
+            backup = backup_path(path)
+            ensure_dir(backup.parent)
+            backup.unlink(missing_ok=True)
+            try:
+                os.link(path, backup)
+            except OSError:
+                shutil.copyfile(path, backup)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    fsync_dir(path.parent)
+
+
+_json_backend = "orjson" if orjson is not None else "json"
+
+
+def json_backend() -> str:
+    return _json_backend
+
+
+def set_json_backend(name: str) -> None:
+    """Choose ``json`` (stdlib) or ``orjson`` for state and web data files."""
+    global _json_backend
+    if name not in {"json", "orjson"}:
+        raise ValueError(f"Unknown JSON backend: {name}")
+    if name == "orjson" and orjson is None:
+        raise ValueError("orjson is not installed")
+    _json_backend = name
+
+
+def dumps_json(payload: Any, pretty: bool = False) -> bytes:
+    """Serialize ``payload`` to UTF-8 bytes, compact unless ``pretty``."""
+    if _json_backend == "orjson":
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(payload, option=option)
+    if pretty:
+        return json.dumps(payload, ensure_ascii=True, indent=2).encode("utf-8")
+    return json.dumps(payload, ensure_ascii=True, separators=(",", ":")).encode("utf-8")
+
+
+def loads_json(data: bytes | str) -> Any:
+    if _json_backend == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _read_json(path: Path) -> Any:
+    data = path.read_bytes()
+    if not data.strip():
+        raise ValueError(f"{path} is empty")
+    return loads_json(data)
+
+
+_restored: list[Path] = []
+_restored_lock = threading.Lock()
+
+
+def take_restored_files() -> list[Path]:
+    """Files ``load_json`` restored from their backup since the last call."""
+    with _restored_lock:
+        restored = list(_restored)
+        _restored.clear()
+    return restored
+
+
 def load_json(path: Path, default: Any) -> Any:
     if not path.exists():
         return default
 
-    text = path.read_text(encoding="utf-8")
-    if not text.strip():
-        return default
+    try:
+        return _read_json(path)
+    except ValueError:
+        backup = backup_path(path)
+        if backup.exists():
+            # A torn or emptied file: fall back to the previous generation.
+            try:
+                payload = _read_json(backup)
+            except ValueError:
+                pass
+            else:
+                # Set the bad file aside so the next write does not rotate it
+                # into the backup slot.
+                os.replace(path, corrupt_path(path))
+                shutil.copyfile(backup, path)
+                with _restored_lock:
+                    _restored.append(path)
+                return payload
+        if not path.read_bytes().strip():
+            return default
+        raise
 
-    return json.loads(text)
 
+def iter_json_records(
+    path: Path, chunk_size: int = 1 << 16
+) -> tuple[dict[str, Any], Iterator[Any]]:
+    """Stream the records of a JSON state file without loading it whole.
 
-def dump_json(path: Path, payload: Any) -> None:
-    ensure_dir(path.parent)
-    path.write_text(json.dumps(payload, ensure_ascii=True, indent=2), encoding="utf-8")
+    The file holds either a bare array of records or an object whose other
+    fields (such as ``schema_version``) come before one array of records.
+    Returns those leading fields and an iterator over the records; only the
+    record being decoded and one read-ahead chunk are held in memory. A
+    missing or empty file has no fields and no records. A malformed or
+    truncated one raises ``ValueError`` once the readable records have been
+    yielded, so callers that must recover from a torn file use ``load_json``.
+    """
+    records = _json_records(path, chunk_size)
+    return next(records), records
+
+
+def _json_records(path: Path, chunk_size: int) -> Iterator[Any]:
+    # Yields the header dict first, then the records.
+    if not path.exists():
+        yield {}
+        return
+
+    decoder = json.JSONDecoder()
+    with path.open("r", encoding="utf-8") as handle:
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buffer, pos, eof
+            if eof:
+                return False
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+
+        def next_token() -> str:
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos].isspace():
+                    pos += 1
+                if pos < len(buffer):
+                    return buffer[pos]
+                if not fill():
+                    return ""
+
+        def expect(token: str) -> None:
+            nonlocal pos
+            if next_token() != token:
+                raise ValueError(f"{path}: expected {token!r}")
+            pos += 1
 
+        def decode() -> Any:
+            nonlocal pos
+            while True:
+                next_token()
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                except ValueError:
+                    if fill():
+                        continue
+                    raise ValueError(f"{path} ends inside a value") from None
+                if (end == len(buffer) or buffer[end] in "0123456789+-.eE") and fill():
+                    # A number cut at the chunk boundary decodes as a shorter one.
+                    continue
+                pos = end
+                return value
 
-def get_json(url: str, query: dict[str, Any] | None = None, timeout: int = 30) -> Any:
-    full_url = url
-    if query:
-        full_url = f"{url}?{urlencode(query)}"
+        header: dict[str, Any] = {}
+        token = next_token()
+        if not token:
+            yield header
+            return
+        if token == "{":
+            pos += 1
+            while True:
+                if next_token() != '"':
+                    raise ValueError(f"{path} holds no array of records")
+                key = decode()
+                expect(":")
+                if next_token() == "[":
+                    break
+                header[key] = decode()
+                expect(",")
+        elif token != "[":
+            raise ValueError(f"{path} holds no array of records")
+        pos += 1
+        yield header
 
-    request = Request(
-        full_url,
-        headers={"User-Agent": "EPI-APE/0.1 (+https://github.com/)"},
-    )
+        if next_token() == "]":
+            return
+        while True:
+            yield decode()
+            token = next_token()
+            if token == "]":
+                return
+            if token != ",":
+                raise ValueError(f"{path}: expected ',' or ']' after a record")
+            pos += 1
 
-    with urlopen(request, timeout=timeout) as response:
-        charset = response.headers.get_content_charset() or "utf-8"
-        text = response.read().decode(charset, errors="replace")
 
-    return json.loads(text)
+def dump_json(
+    path: Path, payload: Any, keep_backup: bool = True, pretty: bool = False
+) -> None:
+    """Write ``payload`` atomically; use ``pretty`` for files people read."""
+    write_atomic(path, dumps_json(payload, pretty=pretty), keep_backup=keep_backup)
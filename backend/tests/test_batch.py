@@ -0,0 +1,285 @@
+"""Batch runner against a local stub of the OpenAI Files and Batches API.
+
+Run from the repository root:
+
+    python -m unittest backend.tests.test_batch
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+from backend.epi_ape.batch import BatchRunner
+from backend.epi_ape.llm import (
+    _chat_json,
+    clear_prefetched,
+    set_metrics_recorder,
+    set_response_cache,
+)
+from backend.epi_ape.metrics import MetricsRecorder
+from backend.epi_ape.resilience import configure_resilience
+from backend.epi_ape.transport import configure_http
+
+MODEL = "gpt-4o-mini"
+SYSTEM = "Return JSON only."
+PROMPTS = [f"Score paper {number}" for number in range(4)]
+
+
+def completion(source: str) -> dict:
+    return {"choices": [{"message": {"content": json.dumps({"source": source})}}]}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves ``/v1`` files, batches and chat completions from ``server``.
+
+    ``server.mode`` decides how a batch ends: ``completed`` answers every
+    request, ``partial`` answers even-numbered lines and fails the others,
+    ``stuck`` never leaves ``in_progress``, ``cancelled`` stops after the
+    first line, and ``rejected`` fails the batch creation itself.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self._handle("GET", b"")
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        self._handle("POST", self.rfile.read(length))
+
+    def _handle(self, method: str, body: bytes) -> None:
+        server: StubServer = self.server
+        path = self.path.removeprefix("/v1")
+        server.log(method, path)
+        parts = path.strip("/").split("/")
+
+        if method == "POST" and path == "/chat/completions":
+            self._json(200, completion("live"))
+        elif method == "POST" and path == "/files":
+            self._json(200, {"id": server.add_file(body)})
+        elif method == "POST" and path == "/batches":
+            if server.mode == "rejected":
+                self._json(500, {"error": {"message": "batch quota exceeded"}})
+                return
+            payload = json.loads(body)
+            self._json(200, server.create_batch(payload["input_file_id"]))
+        elif method == "GET" and parts[0] == "batches" and len(parts) == 2:
+            self._json(200, server.advance(parts[1]))
+        elif method == "POST" and parts[0] == "batches" and parts[2:] == ["cancel"]:
+            self._json(200, server.cancel(parts[1]))
+        elif method == "GET" and parts[0] == "files" and parts[2:] == ["content"]:
+            self._send(200, server.files[parts[1]], "application/jsonl")
+        else:
+            self._json(404, {"error": {"message": f"no route for {path}"}})
+
+    def _json(self, status: int, payload: dict) -> None:
+        self._send(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.mode = "completed"
+        self.requests: list[tuple[str, str]] = []
+        self.files: dict[str, bytes] = {}
+        self.batches: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def reset(self, mode: str) -> None:
+        with self._lock:
+            self.mode = mode
+            self.requests.clear()
+            self.files.clear()
+            self.batches.clear()
+
+    def log(self, method: str, path: str) -> None:
+        with self._lock:
+            self.requests.append((method, path))
+
+    def add_file(self, data: bytes) -> str:
+        with self._lock:
+            file_id = f"file-{len(self.files) + 1}"
+            self.files[file_id] = data
+            return file_id
+
+    def create_batch(self, input_file_id: str) -> dict:
+        with self._lock:
+            batch_id = f"batch-{len(self.batches) + 1}"
+            batch = {"id": batch_id, "status": "validating"}
+            self.batches[batch_id] = {**batch, "input_file_id": input_file_id}
+            return batch
+
+    def cancel(self, batch_id: str) -> dict:
+        with self._lock:
+            self.batches[batch_id]["status"] = "cancelling"
+            return dict(self.batches[batch_id])
+
+    def advance(self, batch_id: str) -> dict:
+        batch = self.batches[batch_id]
+        if self.mode == "stuck":
+            batch["status"] = "in_progress"
+            return dict(batch)
+
+        # The JSONL lines sit between the multipart headers and boundary.
+        upload = self.files[batch["input_file_id"]]
+        lines = [
+            json.loads(line)
+            for line in upload.replace(b"\r\n", b"\n").split(b"\n")
+            if line.startswith(b'{"custom_id"')
+        ]
+        if self.mode == "cancelled":
+            lines = lines[:1]
+        output = []
+        for number, line in enumerate(lines):
+            failed = self.mode == "partial" and number % 2
+            output.append(
+                {
+                    "custom_id": line["custom_id"],
+                    "response": {
+                        "status_code": 500 if failed else 200,
+                        "body": {} if failed else completion("batch"),
+                    },
+                }
+            )
+        file_id = self.add_file(
+            "".join(json.dumps(item) + "\n" for item in output).encode("utf-8")
+        )
+        batch["status"] = "cancelled" if self.mode == "cancelled" else "completed"
+        batch["output_file_id"] = file_id
+        return dict(batch)
+
+
+class BatchRunnerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = StubServer()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        configure_http(max_per_host=4, timeout=10.0)
+        configure_resilience(max_attempts=1, failure_threshold=100, cooldown=60.0)
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        env = {
+            "OPENAI_API_KEY": "test-key",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{self.server.server_port}/v1",
+        }
+        patcher = mock.patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        set_response_cache(None)
+        self.metrics = MetricsRecorder()
+        set_metrics_recorder(self.metrics)
+        self.addCleanup(set_metrics_recorder, None)
+        clear_prefetched()
+        self.addCleanup(clear_prefetched)
+
+    def run_stage(self, mode: str, max_wait: float = 60.0) -> tuple[BatchRunner, int]:
+        """Prefetch ``PROMPTS`` as a batch, then make the stage's own calls."""
+        self.server.reset(mode)
+        runner = BatchRunner(
+            self.tmp / "batches",
+            poll_interval=0,
+            max_wait=max_wait,
+            sleep=lambda _: None,
+        )
+        primed = runner.prefetch(
+            [(MODEL, SYSTEM, prompt) for prompt in PROMPTS], stage="advisor"
+        )
+        self.results = [
+            _chat_json(MODEL, SYSTEM, prompt, stage="advisor") for prompt in PROMPTS
+        ]
+        return runner, primed
+
+    def outcomes(self) -> list[str]:
+        return [call.outcome for call in self.metrics.records]
+
+    def live_calls(self) -> int:
+        return self.server.requests.count(("POST", "/chat/completions"))
+
+    def test_completed_job_answers_every_request(self) -> None:
+        runner, primed = self.run_stage("completed")
+
+        self.assertEqual(primed, 4)
+        [job] = runner.stats.jobs
+        self.assertEqual(
+            (job.status, job.submitted, job.completed), ("completed", 4, 4)
+        )
+        self.assertEqual(self.results, [{"source": "batch"}] * 4)
+        self.assertEqual(self.outcomes(), ["batched"] * 4)
+        self.assertEqual(self.live_calls(), 0)
+        self.assertEqual(len(list((self.tmp / "batches").glob("*.jsonl"))), 2)
+
+    def test_partial_job_falls_back_to_live_calls(self) -> None:
+        runner, primed = self.run_stage("partial")
+
+        self.assertEqual(primed, 2)
+        [job] = runner.stats.jobs
+        self.assertEqual((job.completed, job.failed), (2, 2))
+        self.assertEqual(
+            [result["source"] for result in self.results],
+            ["batch", "live", "batch", "live"],
+        )
+        self.assertEqual(self.outcomes(), ["batched", "ok", "batched", "ok"])
+        self.assertEqual(self.live_calls(), 2)
+        summary = self.metrics.summary()["openai"]
+        self.assertEqual((summary["batched"], summary["ok"]), (2, 2))
+
+    def test_timed_out_job_is_cancelled(self) -> None:
+        runner, primed = self.run_stage("stuck", max_wait=0)
+
+        self.assertEqual(primed, 0)
+        [job] = runner.stats.jobs
+        self.assertEqual((job.status, job.failed), ("timed_out", 4))
+        self.assertIn(("POST", "/batches/batch-1/cancel"), self.server.requests)
+        self.assertEqual(self.outcomes(), ["ok"] * 4)
+        self.assertEqual(self.live_calls(), 4)
+
+    def test_cancelled_job_keeps_partial_output(self) -> None:
+        runner, primed = self.run_stage("cancelled")
+
+        self.assertEqual(primed, 1)
+        [job] = runner.stats.jobs
+        self.assertEqual((job.status, job.completed, job.failed), ("cancelled", 1, 3))
+        self.assertEqual(self.outcomes(), ["batched", "ok", "ok", "ok"])
+
+    def test_failed_job_is_recorded_on_the_runner(self) -> None:
+        runner, primed = self.run_stage("rejected")
+
+        self.assertEqual(primed, 0)
+        self.assertEqual(runner.stats.jobs, [])
+        [error] = runner.stats.errors
+        self.assertTrue(error.startswith("openai (advisor): "), error)
+        self.assertIn("500", error)
+        self.assertEqual(self.outcomes(), ["ok"] * 4)
+        self.assertEqual(self.live_calls(), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
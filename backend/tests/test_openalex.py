@@ -0,0 +1,169 @@
+"""OpenAlex client against a local stub of the works endpoint.
+
+Run from the repository root:
+
+    python -m unittest backend.tests.test_openalex
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+from urllib.error import HTTPError
+from urllib.parse import parse_qs, urlparse
+
+from backend.epi_ape.openalex import OpenAlexCache, OpenAlexClient
+from backend.epi_ape.resilience import configure_resilience
+from backend.epi_ape.transport import configure_http
+from backend.epi_ape.utils import set_fsync
+
+# Every search has this many pages; a search containing "broken" answers 500.
+PAGES = 5
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        query = parse_qs(urlparse(self.path).query)
+        search = query["search"][0]
+        cursor = query["cursor"][0]
+        per_page = int(query["per-page"][0])
+        self.server.log(search, cursor, self.headers.get("If-None-Match"))
+
+        if "broken" in search:
+            self._send(500, b"")
+            return
+        etag = f'"{search}-{cursor}"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", etag)
+            return
+        page = 0 if cursor == "*" else int(cursor)
+        body = json.dumps(
+            {
+                "meta": {"next_cursor": str(page + 1) if page + 1 < PAGES else None},
+                "results": [
+                    {"title": f"{search} work {page * per_page + i}"}
+                    for i in range(per_page)
+                ],
+            }
+        ).encode("utf-8")
+        self._send(200, body, etag)
+
+    def _send(self, status: int, body: bytes, etag: str | None = None) -> None:
+        self.send_response(status)
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.requests: list[tuple[str, str, str | None]] = []
+        self._lock = threading.Lock()
+
+    def log(self, search: str, cursor: str, etag: str | None) -> None:
+        with self._lock:
+            self.requests.append((search, cursor, etag))
+
+
+class OpenAlexClientTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        set_fsync(False)
+        cls.server = StubServer()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+        set_fsync(True)
+
+    def setUp(self) -> None:
+        self.server.requests.clear()
+        configure_http(max_per_host=4, timeout=10.0)
+        configure_resilience(max_attempts=1, failure_threshold=100, cooldown=60.0)
+        self.tmp = Path(tempfile.mkdtemp())
+        base_url = f"http://127.0.0.1:{self.server.server_port}"
+        patcher = mock.patch.dict(os.environ, {"OPENALEX_BASE_URL": base_url})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+
+    def client(self, ttl: float = 3600.0) -> OpenAlexClient:
+        return OpenAlexClient(cache=OpenAlexCache(self.tmp / "cache", ttl=ttl))
+
+    def test_follows_cursor_pages_up_to_limit(self) -> None:
+        works = self.client().search_works("paging", "f", "s", 450)
+
+        self.assertEqual(len(works), 450)
+        self.assertEqual(works[-1]["title"], "paging work 449")
+        cursors = [cursor for _, cursor, _ in self.server.requests]
+        self.assertEqual(cursors, ["*", "1", "2"])
+
+    def test_stops_when_pages_run_out(self) -> None:
+        works = self.client().search_works("short", "f", "s", 10_000)
+
+        self.assertEqual(len(works), PAGES * 200)
+        self.assertEqual(len(self.server.requests), PAGES)
+
+    def test_fresh_entries_are_served_from_cache(self) -> None:
+        first = self.client()
+        expected = first.search_many(["alpha", "beta"], "f", "s", 300)
+        self.assertEqual(first.stats.requests, 4)
+        self.server.requests.clear()
+
+        second = self.client()
+        works = second.search_many(["alpha", "beta"], "f", "s", 300)
+
+        self.assertEqual(works, expected)
+        self.assertEqual(self.server.requests, [])
+        self.assertEqual((second.stats.requests, second.stats.cache_hits), (0, 4))
+
+    def test_stale_entries_revalidate_with_etag(self) -> None:
+        expected = self.client(ttl=0).search_works("gamma", "f", "s", 300)
+        self.server.requests.clear()
+
+        client = self.client(ttl=0)
+        works = client.search_works("gamma", "f", "s", 300)
+
+        self.assertEqual(works, expected)
+        self.assertEqual(
+            self.server.requests,
+            [("gamma", "*", '"gamma-*"'), ("gamma", "1", '"gamma-1"')],
+        )
+        self.assertEqual((client.stats.requests, client.stats.revalidated), (2, 2))
+
+    def test_failed_query_leaves_the_others(self) -> None:
+        client = self.client()
+        results = client.search_many(["alpha", "broken", "beta"], "f", "s", 50)
+
+        self.assertEqual([len(works) for works in results], [50, 0, 50])
+        self.assertEqual(results[2][0]["title"], "beta work 0")
+
+    def test_every_query_failing_raises(self) -> None:
+        client = self.client()
+        with self.assertRaises(HTTPError) as caught:
+            client.search_many(["broken one", "broken two"], "f", "s", 50)
+        self.assertEqual(caught.exception.code, 500)
+
+
+if __name__ == "__main__":
+    unittest.main()